@@ -0,0 +1,274 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+import generator
+
+PRIMITIVES = [
+    {'type': 'integer'},
+    {'type': 'number'},
+    {'type': 'boolean'},
+    {'type': 'string'},
+    {'type': 'string', 'format': 'date-time'},
+    {'type': 'array', 'items': {'type': 'string'}},
+]
+
+STAGES = ['load', 'resolve_models', 'parse_operations', 'render', 'write']
+
+# --- Synthetic Specs ---
+def base_spec(title):
+    return {
+        'openapi': '3.0.0',
+        'info': {'title': title, 'version': '1.0.0'},
+        'servers': [{'url': 'https://api.example.com'}],
+        'components': {
+            'schemas': {},
+            'securitySchemes': {'ApiKeyAuth': {'type': 'apiKey', 'in': 'header', 'name': 'X-API-Key'}},
+        },
+        'paths': {},
+    }
+
+def flat_schemas(count, properties=8, seed=0):
+    """Spec with `count` object schemas of primitive properties, some referencing each other."""
+    rng = random.Random(seed)
+    spec = base_spec(f"Flat {count}")
+    schemas = spec['components']['schemas']
+    for i in range(count):
+        props = {}
+        for j in range(properties):
+            props[f"field_{j}"] = {**rng.choice(PRIMITIVES), 'description': f"Field {j} of model {i}"}
+        if i > 0:
+            props['related'] = {'$ref': f"#/components/schemas/Model{rng.randrange(i)}"}
+        schemas[f"Model{i}"] = {'type': 'object', 'required': ['field_0'], 'properties': props}
+    return spec
+
+def deep_nesting(count, depth):
+    """Spec with `count` schemas, each an inline object nested `depth` levels deep."""
+    spec = base_spec(f"Deep {count}x{depth}")
+    for i in range(count):
+        node = {'type': 'object', 'properties': {'leaf': {'type': 'string'}}}
+        for level in range(depth):
+            node = {'type': 'object', 'properties': {'value': {'type': 'integer'}, f"level{level}": node}}
+        spec['components']['schemas'][f"Deep{i}"] = node
+    return spec
+
+def many_enums(count, values):
+    """Spec with `count` schemas carrying several large enum properties."""
+    spec = base_spec(f"Enums {count}x{values}")
+    for i in range(count):
+        spec['components']['schemas'][f"Enum{i}"] = {
+            'type': 'object',
+            'properties': {
+                f"choice_{j}": {'type': 'string', 'enum': [f"value_{i}_{j}_{k}" for k in range(values)]}
+                for j in range(4)
+            },
+        }
+    return spec
+
+def many_paths(count, schemas=50):
+    """Spec with `count` paths whose operations take parameters and return models."""
+    spec = flat_schemas(schemas)
+    spec['info']['title'] = f"Paths {count}"
+    for i in range(count):
+        model_ref = {'$ref': f"#/components/schemas/Model{i % schemas}"}
+        spec['paths'][f"/resource{i}/{{item_id}}"] = {
+            'get': {
+                'summary': f"Get resource {i}",
+                'x-mcp-cache-ttl': 30,
+                'parameters': [
+                    {'name': 'item_id', 'in': 'path', 'required': True, 'schema': {'type': 'string'}},
+                    {'name': 'limit', 'in': 'query', 'schema': {'type': 'integer', 'default': 10}},
+                    {'name': 'X-Trace', 'in': 'header', 'schema': {'type': 'string'}},
+                ],
+                'responses': {'200': {'description': 'OK', 'content': {'application/json': {'schema': model_ref}}}},
+            },
+            'put': {
+                'summary': f"Replace resource {i}",
+                'parameters': [{'name': 'item_id', 'in': 'path', 'required': True, 'schema': {'type': 'string'}}],
+                'requestBody': {'required': True, 'content': {'application/json': {'schema': model_ref}}},
+                'responses': {'200': {'description': 'OK', 'content': {'application/json': {'schema': model_ref}}}},
+            },
+        }
+    return spec
+
+SCENARIOS = {
+    'schemas_10': lambda: flat_schemas(10),
+    'schemas_1k': lambda: flat_schemas(1000),
+    'schemas_10k': lambda: flat_schemas(10000),
+    'deep_nesting': lambda: deep_nesting(50, 20),
+    'many_enums': lambda: many_enums(500, 50),
+    'many_paths': lambda: many_paths(2000),
+}
+
+# --- Stages ---
+def reset_caches():
+    generator._loaded_specs.clear()
+
+def run_stages(spec_path, output_path):
+    """Run every generation stage once, returning a callable per stage in order."""
+    state = {}
+
+    def load():
+        reset_caches()
+        state['spec'] = generator.load_spec(spec_path)
+
+    def resolve_models():
+        # Every model type is resolved here (SchemaResolver.type_for)
+        state['resolver'] = generator.SchemaResolver(state['spec'])
+        state['resolver'].resolve_all()
+
+    def parse_operations():
+        # Operations, servers and auth; the resolver's models are reused
+        state['context'] = generator.parse_spec_dict(state['spec'], state['resolver'])
+
+    def render():
+        state['output'] = generator.get_template().render(**state['context'])
+
+    def write():
+        with open(output_path, 'w') as f:
+            f.write(state['output'])
+
+    return [('load', load), ('resolve_models', resolve_models), ('parse_operations', parse_operations),
+            ('render', render), ('write', write)], state
+
+def benchmark_scenario(name, spec, spec_format, repeat, workdir):
+    spec_path = os.path.join(workdir, f"{name}.{spec_format}")
+    output_path = os.path.join(workdir, f"mcp_server_{name}.py")
+    with open(spec_path, 'w') as f:
+        if spec_format == 'json':
+            json.dump(spec, f)
+        else:
+            yaml.safe_dump(spec, f, sort_keys=False)
+
+    # Timings: best of `repeat` untraced runs
+    seconds = {stage: float('inf') for stage in STAGES}
+    for _ in range(repeat):
+        stages, state = run_stages(spec_path, output_path)
+        for stage, func in stages:
+            started = time.perf_counter()
+            func()
+            seconds[stage] = min(seconds[stage], time.perf_counter() - started)
+
+    # Peak memory: one separate traced run, since tracing distorts timings
+    peak_bytes = {}
+    stages, state = run_stages(spec_path, output_path)
+    tracemalloc.start()
+    for stage, func in stages:
+        tracemalloc.reset_peak()
+        func()
+        peak_bytes[stage] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'spec_bytes': os.path.getsize(spec_path),
+        'schemas': len(spec['components']['schemas']),
+        'models': len(state['context']['models']),
+        'paths': len(spec['paths']),
+        'output_bytes': len(state['output'].encode('utf-8')),
+        'stages': {stage: {'seconds': seconds[stage], 'peak_bytes': peak_bytes[stage]} for stage in STAGES},
+        'total_seconds': sum(seconds.values()),
+    }
+
+# --- Reporting ---
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def format_bytes(count):
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if count < 1024 or unit == 'GiB':
+            return f"{count:.1f} {unit}"
+        count /= 1024
+
+def print_scenario(name, result):
+    print(f"\n{name}: {result['schemas']} schemas -> {result['models']} models, {result['paths']} paths, "
+          f"spec {format_bytes(result['spec_bytes'])}, output {format_bytes(result['output_bytes'])}")
+    for stage in STAGES:
+        stats = result['stages'][stage]
+        print(f"  {stage:<16} {stats['seconds'] * 1000:10.1f} ms   peak {format_bytes(stats['peak_bytes'])}")
+    print(f"  {'total':<16} {result['total_seconds'] * 1000:10.1f} ms")
+
+def compare(results, baseline_path, threshold):
+    """Print per-stage changes against a previous results file; return True if nothing regressed."""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    print(f"\nComparison with {baseline_path} (commit {baseline.get('commit', '?')}):")
+    ok = True
+    for name, result in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for stage in STAGES + ['total']:
+            if stage == 'total':
+                old, new = previous['total_seconds'], result['total_seconds']
+            elif stage in previous['stages']:
+                old, new = previous['stages'][stage]['seconds'], result['stages'][stage]['seconds']
+            else:
+                # Stage added or renamed since the baseline
+                continue
+            if old <= 0:
+                continue
+            change = (new - old) / old
+            flag = ''
+            if change > threshold:
+                flag = '  REGRESSION'
+                ok = False
+            print(f"  {name:<14} {stage:<16} {old * 1000:10.1f} -> {new * 1000:10.1f} ms ({change:+.1%}){flag}")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark each stage of MCP server generation on synthetic specs.")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS), help="Scenarios to run (default: all)")
+    parser.add_argument("--format", choices=["yaml", "json"], default="yaml", help="Format of the synthetic spec files")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per scenario; the fastest is reported")
+    parser.add_argument("--output", default=None, help="Results file (default: bench_results/<commit>.json)")
+    parser.add_argument("--compare", default=None, metavar="RESULTS", help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression (default: 0.10)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'spec_format': args.format,
+        'libyaml': generator.SpecLoader.__name__ == 'CSafeLoader',
+        'scenarios': {},
+    }
+
+    # Compile the template up front so render timings exclude it
+    started = time.perf_counter()
+    generator.get_template()
+    results['template_compile_seconds'] = time.perf_counter() - started
+    print(f"Template compiled in {results['template_compile_seconds'] * 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in args.scenarios:
+            result = benchmark_scenario(name, SCENARIOS[name](), args.format, args.repeat, workdir)
+            results['scenarios'][name] = result
+            print_scenario(name, result)
+
+    output_path = args.output or os.path.join('bench_results', f"{commit}.json")
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+import httpx
+from fastapi import FastAPI, HTTPException, Response
+
+import generator
+
+DEFAULT_BUILD_DIR = '.mcp_gateway'
+
+# Module state that survives a reload. The upstream settings are copied rather
+# than shared, so each module's config watcher rebuilds its own client and
+# clears its own cache. The new module's client uses the new spec's auth on the
+# old connection pool, and its response cache starts empty.
+CARRIED_STATE = ('metrics',)
+CARRIED_CONFIG = ('api_key', 'base_url')
+# The limiter survives only while the new spec keeps these settings
+LIMITER_SETTINGS = ('rate', 'burst', 'max_concurrency', 'max_wait')
+# Seconds a replaced module stays importable for requests still using it
+RETIRE_AFTER = 60
+
+# --- Generated Servers ---
+def spec_signature(spec_path: str):
+    try:
+        stat = os.stat(spec_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def same_limits(old_module, new_module) -> bool:
+    old_limiter = getattr(old_module, 'upstream_limiter', None)
+    new_limiter = getattr(new_module, 'upstream_limiter', None)
+    if old_limiter is None or new_limiter is None:
+        return False
+    return all(getattr(old_limiter, attr) == getattr(new_limiter, attr) for attr in LIMITER_SETTINGS)
+
+def env_prefix(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]', '_', name).upper()
+
+class MountedAPI:
+    """ASGI app forwarding to one generated server.
+
+    Requests go to whatever module is current, so replacing `module` swaps
+    the API's routes and models in a single assignment.
+    """
+
+    def __init__(self, name: str, spec_path: str, server_path: str, module):
+        self.name = name
+        self.spec_path = spec_path
+        self.server_path = server_path
+        self.module = module
+        self.spec_signature = spec_signature(spec_path)
+        self.generation = 0
+
+    async def __call__(self, scope, receive, send):
+        await self.module.app(scope, receive, send)
+
+# --- Gateway ---
+class Gateway:
+    """One FastAPI app serving many generated servers under /<name> prefixes.
+
+    All servers share the process, its event loop and imported libraries.
+    Upstream connection pools are shared per upstream host, and /context,
+    /validate and /health cover every mounted API. With a reload interval,
+    spec files are watched and changed APIs are swapped in while serving.
+    """
+
+    def __init__(self, specs: Dict[str, str], build_dir: str = DEFAULT_BUILD_DIR, options: Dict[str, Any] = None,
+                 reload_interval: float = 0):
+        self.specs = specs
+        self.build_dir = build_dir
+        self.options = options or {}
+        self.reload_interval = reload_interval
+        self.apis = {}
+        self.transports = {}  # (scheme, host, port) -> shared transport
+        self.running = False
+        self._lifespans = {}  # module name -> its entered lifespan context
+        self._retiring = set()
+        self._context = None
+        self.app = FastAPI(title="MCP Gateway", description="Gateway serving several generated MCP servers", lifespan=self.lifespan)
+        self._add_routes()
+
+    def load(self):
+        """Generate (if needed), import and mount every spec."""
+        os.makedirs(self.build_dir, exist_ok=True)
+        build_cache = generator.load_build_cache()
+        for name, spec_path in self.specs.items():
+            server_path = os.path.join(self.build_dir, f"mcp_server_{name}.py")
+            cache_key = os.path.abspath(server_path)
+            status, build_cache[cache_key] = generator.build_server(
+                spec_path, server_path, cache_entry=build_cache.get(cache_key), options=self.options)
+            module = self.import_server(name, server_path)
+            self.apis[name] = MountedAPI(name, spec_path, server_path, module)
+            self.app.mount(f"/{name}", self.apis[name])
+            print(f"Mounted {spec_path} at /{name} ({status})")
+        generator.save_build_cache(build_cache)
+        return self
+
+    def import_server(self, name: str, server_path: str):
+        module = generator.load_server_module(f"mcp_gateway_{env_prefix(name).lower()}", server_path)
+        # Per-API credentials, since API_KEY and API_BASE_URL would be shared
+        prefix = env_prefix(name)
+        module.api_config.update(api_key=os.environ.get(f"{prefix}_API_KEY"),
+                                 base_url=os.environ.get(f"{prefix}_API_BASE_URL"))
+        module.api_client.transport = self.transport_for(module.api_config.base_url, module.api_client.settings)
+        self.configure_module(name, module)
+        return module
+
+    def configure_module(self, name: str, module):
+        # MCP_CONFIG_FILE would be shared by every API, so each has its own variable
+        module.config_file.path = os.environ.get(f"{env_prefix(name)}_CONFIG_FILE")
+
+    def transport_for(self, base_url: str, settings) -> httpx.AsyncHTTPTransport:
+        """Return the connection pool shared by every API on the same upstream host."""
+        url = httpx.URL(base_url)
+        key = (url.scheme, url.host, url.port)
+        transport = self.transports.get(key)
+        if transport is None:
+            transport = self.transports[key] = httpx.AsyncHTTPTransport(limits=settings.limits(), http2=settings.http2)
+        return transport
+
+    async def start_module(self, module):
+        # Mounted apps' lifespans are not run by Starlette, so run them here
+        lifespan = module.app.router.lifespan_context(module.app)
+        await lifespan.__aenter__()
+        self._lifespans[module.__name__] = lifespan
+
+    async def stop_module(self, module):
+        lifespan = self._lifespans.pop(module.__name__, None)
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI):
+        for api in self.apis.values():
+            await self.start_module(api.module)
+        self.running = True
+        watcher = asyncio.create_task(self.watch()) if self.reload_interval > 0 else None
+        try:
+            yield
+        finally:
+            self.running = False
+            if watcher is not None:
+                watcher.cancel()
+            for task in list(self._retiring):
+                task.cancel()
+            for lifespan in list(self._lifespans.values()):
+                await lifespan.__aexit__(None, None, None)
+            self._lifespans.clear()
+            # API clients never close transports they were given, so close them here
+            for transport in self.transports.values():
+                await transport.aclose()
+
+    # --- Hot Reload ---
+    async def watch(self):
+        """Poll spec files and reload the APIs whose spec changed."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            for name, api in list(self.apis.items()):
+                signature = spec_signature(api.spec_path)
+                if signature is not None and signature != api.spec_signature:
+                    api.spec_signature = signature
+                    await self.reload(name)
+
+    async def reload(self, name: str) -> bool:
+        """Regenerate one API and swap it in without dropping requests.
+
+        The new module takes over the old one's config, connection pool and
+        metrics, and its limiter if the limits did not change. It starts with
+        its own client, config file watcher and empty response cache. Requests
+        already running finish on the old module, whose lifespan is closed
+        once it retires. Returns True if a new version was swapped in.
+        """
+        api = self.apis[name]
+        generation = api.generation + 1
+        try:
+            # Generation and import are CPU-bound, so keep them off the event loop
+            module = await asyncio.to_thread(self._rebuild, api, generation)
+        except Exception as e:
+            print(f"Reloading /{name} failed, still serving the previous version: {type(e).__name__}: {e}")
+            return False
+        if module is None:
+            return False
+
+        old_module = api.module
+        for attr in CARRIED_STATE:
+            if hasattr(old_module, attr):
+                setattr(module, attr, getattr(old_module, attr))
+        for attr in CARRIED_CONFIG:
+            setattr(module.api_config, attr, getattr(old_module.api_config, attr))
+        if same_limits(old_module, module):
+            # Keeps in-flight slots, queued callers and any Retry-After pause
+            module.upstream_limiter = old_module.upstream_limiter
+        module.api_client.transport = old_module.api_client.transport
+        self.configure_module(name, module)
+        if self.running:
+            await self.start_module(module)
+        api.module, api.generation = module, generation
+        self._context = None
+        task = asyncio.create_task(self.retire(old_module))
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+        print(f"Reloaded {api.spec_path} at /{name}")
+        return True
+
+    async def retire(self, module):
+        await asyncio.sleep(RETIRE_AFTER)
+        await self.stop_module(module)
+        sys.modules.pop(module.__name__, None)
+
+    def _rebuild(self, api: MountedAPI, generation: int):
+        build_cache = generator.load_build_cache()
+        cache_key = os.path.abspath(api.server_path)
+        status, build_cache[cache_key] = generator.build_server(
+            api.spec_path, api.server_path, cache_entry=build_cache.get(cache_key), options=self.options)
+        generator.save_build_cache(build_cache)
+        if status != 'generated':
+            return None
+        return generator.load_server_module(f"mcp_gateway_{env_prefix(api.name).lower()}_{generation}", api.server_path)
+
+    def context(self) -> bytes:
+        if self._context is None:
+            document = {"apis": {}}
+            for name, api in self.apis.items():
+                document["apis"][name] = {
+                    "title": api.module.app.title,
+                    "prefix": f"/{name}",
+                    **api.module.CONTEXT,
+                }
+            self._context = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        return self._context
+
+    def resolve_model(self, qualified_name: Any):
+        api_name, _, model_name = str(qualified_name or '').partition('.')
+        api = self.apis.get(api_name)
+        if api is None or model_name not in api.module.models_dict:
+            raise HTTPException(status_code=404, detail=f"Model {qualified_name} not found; use '<api>.<model>'")
+        return api, model_name
+
+    def _add_routes(self):
+        @self.app.get("/context")
+        async def gateway_context():
+            return Response(content=self.context(), media_type="application/json")
+
+        @self.app.post("/validate")
+        async def gateway_validate(request: Dict[str, Any]):
+            if not request.get("model_name"):
+                raise HTTPException(status_code=400, detail="model_name is required")
+            api, model_name = self.resolve_model(request["model_name"])
+            return await api.module.validate_model({**request, "model_name": model_name})
+
+        @self.app.get("/health")
+        async def gateway_health():
+            apis = {name: await api.module.health_check() for name, api in self.apis.items()}
+            return {"status": "healthy", "apis": apis, "upstream_pools": len(self.transports)}
+
+def parse_spec_args(values: List[str]) -> Dict[str, str]:
+    """Turn 'name=spec', spec files, directories and globs into {name: spec path}."""
+    specs = {}
+    for value in values:
+        name, sep, pattern = value.partition('=')
+        if not sep or os.path.exists(value):
+            name, pattern = None, value
+        for spec_path in generator.expand_spec_paths(pattern):
+            api_name = name or generator.get_api_name_from_spec(spec_path)
+            if api_name in specs:
+                raise ValueError(f"Two specs map to /{api_name}; name one of them with name=path")
+            specs[api_name] = spec_path
+    return specs
+
+def create_gateway(spec_args: List[str], build_dir: str = DEFAULT_BUILD_DIR, options: Dict[str, Any] = None,
+                   reload_interval: float = 0) -> Gateway:
+    return Gateway(parse_spec_args(spec_args), build_dir, options, reload_interval).load()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve several OpenAPI specs from one MCP gateway process.")
+    parser.add_argument("specs", nargs="+", help="Spec files, directories or globs; use name=path to choose an API's prefix")
+    parser.add_argument("--build-dir", default=DEFAULT_BUILD_DIR, help=f"Where generated servers are written (default: {DEFAULT_BUILD_DIR})")
+    parser.add_argument("--fast-startup", action="store_true", help="Generate servers with lazily built models")
+    parser.add_argument("--strict", action="store_true", help="Validate strictly by default")
+    parser.add_argument("--reload", action="store_true", help="Watch spec files and swap in changed APIs without restarting")
+    parser.add_argument("--reload-interval", type=float, default=1.0, help="Seconds between spec checks with --reload (default: 1)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    try:
+        gateway = create_gateway(args.specs, args.build_dir, {'fast_startup': args.fast_startup, 'strict': args.strict},
+                                 args.reload_interval if args.reload else 0)
+    except ValueError as e:
+        parser.error(str(e))
+    if not gateway.apis:
+        print("No specs found")
+        sys.exit(1)
+
+    import uvicorn
+    uvicorn.run(gateway.app, host=args.host, port=args.port)
@@ -2,10 +2,47 @@ import yaml
 import json
 import os
 import sys
-from jinja2 import Environment, FileSystemLoader
+import argparse
+import glob
+import hashlib
+import importlib.util
+import itertools
+import keyword
+import pickle
+import subprocess
+import threading
+import time
+import types
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from typing import Dict, Any, List
 import re
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SpecLoader
+except ImportError:
+    from yaml import SafeLoader as SpecLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GENERATOR_VERSION = "0.2.0"
+# Built-in templates, found next to this file rather than in the working directory
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+TEMPLATE_NAME = 'mcp_server.py.j2'
+# Models per shard module when a package is sharded alphabetically
+SHARD_SIZE = 100
+BUILD_CACHE_FILE = '.mcp_build_cache.json'
+
+# Directory for on-disk caches of parsed specs (disabled when empty)
+spec_cache_dir = os.environ.get('MCP_SPEC_CACHE_DIR', '')
+# Directory for compiled template bytecode (Jinja's per-user temp directory when unset)
+template_cache_dir = os.environ.get('MCP_TEMPLATE_CACHE_DIR') or None
+
 def convert_type_to_python(openapi_type: str, format_: str = None, items: Dict = None) -> str:
     """Convert OpenAPI types to Python types."""
     if openapi_type == "integer":
@@ -29,37 +66,679 @@ def convert_type_to_python(openapi_type: str, format_: str = None, items: Dict =
         return "Dict[str, Any]"
     return "Any"
 
-def parse_openapi_spec(spec_path: str) -> Dict[str, Any]:
-    """Parse OpenAPI spec and extract models."""
-    with open(spec_path, 'r') as f:
-        spec = yaml.safe_load(f)
+HTTP_METHODS = ('get', 'put', 'post', 'delete', 'patch', 'head', 'options')
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'}
+# Parameter locations the generated server can place arguments in
+PARAM_LOCATIONS = ('path', 'query', 'header', 'cookie')
+
+def resolve_local_ref(spec: Dict[str, Any], obj: Dict[str, Any]) -> Dict[str, Any]:
+    """Follow a local '#/...' $ref (if any) and return the referenced object."""
+    seen = set()
+    while isinstance(obj, dict) and '$ref' in obj:
+        ref = obj['$ref']
+        if not ref.startswith('#/') or ref in seen:
+            return {}
+        seen.add(ref)
+        target = spec
+        for part in ref[2:].split('/'):
+            part = part.replace('~1', '/').replace('~0', '~')
+            target = target.get(part, {}) if isinstance(target, dict) else {}
+        obj = target
+    return obj
+
+def get_ref_model_name(schema: Dict[str, Any]) -> str:
+    """Return the component model name a schema refers to, if any."""
+    if isinstance(schema, dict):
+        ref = schema.get('$ref', '')
+        if ref.startswith('#/components/schemas/'):
+            return ref.rsplit('/', 1)[-1]
+    return None
+
+def get_operation_id(method: str, path: str, operation: Dict[str, Any]) -> str:
+    """Build a Python identifier for an operation."""
+    op_id = operation.get('operationId') or f"{method}_{path}"
+    op_id = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', op_id)
+    op_id = re.sub(r'[^a-zA-Z0-9]+', '_', op_id).strip('_').lower()
+    if not op_id or op_id[0].isdigit():
+        op_id = f"op_{op_id}"
+    return op_id
+
+def get_json_schema(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the JSON media type schema from a content map."""
+    for media_type, media in (content or {}).items():
+        if media_type == 'application/json' or media_type.endswith('+json'):
+            return media.get('schema', {})
+    return None
+
+# Names the generated module already uses; schema classes must not shadow them
+RESERVED_CLASS_NAMES = {
+    'BaseModel', 'RootModel', 'ConfigDict', 'Field', 'ValidationError', 'TypeAdapter',
+    'FastAPI', 'HTTPException', 'Depends', 'Header', 'Query', 'Body', 'Request', 'Response',
+    'JSONResponse', 'PlainTextResponse', 'StreamingResponse', 'FastJSONResponse', 'DuplexStreamingResponse',
+    'Dict', 'List', 'Any', 'Literal', 'Optional', 'Union', 'OrderedDict', 'namedtuple',
+    'AsyncExitStack', 'APIConfig', 'SharedConfigFile', 'ClientSettings', 'APIClient',
+    'Histogram', 'Metrics', 'MetricsMiddleware', 'ResponseCache', 'UpstreamLimiter',
+    'UpstreamResult', 'StaticPayload', 'CONTEXT', 'OPERATIONS', 'app', 'json', 'os', 'time',
+    'datetime', 'asyncio', 'bisect', 'math', 'random', 'httpx', 'gzip', 'hashlib', 'quote',
+    'orjson', 'brotli', 'h2', 'MODELS', 'EXTERNAL_MODELS', 'LazyModels',
+}
+
+# Names a field must not shadow: BaseModel attributes and annotation names
+RESERVED_FIELD_NAMES = {
+    'copy', 'dict', 'json', 'schema', 'schema_json', 'construct', 'validate', 'fields',
+    'parse_obj', 'parse_raw', 'parse_file', 'from_orm', 'update_forward_refs',
+    'model_config', 'model_fields', 'model_computed_fields', 'model_extra', 'model_fields_set',
+    'model_construct', 'model_copy', 'model_dump', 'model_dump_json', 'model_json_schema',
+    'model_parametrized_name', 'model_post_init', 'model_rebuild', 'model_validate',
+    'model_validate_json', 'model_validate_strings',
+    # Names the field annotations use; a field named after one shadows it in the class body
+    'datetime', 'Optional', 'List', 'Dict', 'Any', 'Union', 'Literal', 'Field',
+}
+
+def to_class_name(name: str) -> str:
+    """Turn a schema or property name into a PascalCase identifier."""
+    parts = [part for part in re.split(r'[^a-zA-Z0-9]+', str(name)) if part]
+    class_name = ''.join(part[0].upper() + part[1:] for part in parts) or 'Model'
+    if class_name[0].isdigit():
+        class_name = f"Model{class_name}"
+    return class_name
+
+def to_field_name(name: str) -> str:
+    """Turn a property name into a valid, non-reserved field identifier."""
+    field_name = re.sub(r'\W', '_', str(name))
+    if not field_name or field_name[0].isdigit():
+        field_name = f"field_{field_name}"
+    elif field_name.startswith('_'):
+        field_name = f"field{field_name}"
+    if keyword.iskeyword(field_name) or field_name in RESERVED_FIELD_NAMES:
+        field_name = f"{field_name}_"
+    return field_name
+
+def _single_line(text: Any) -> str:
+    return ' '.join(str(text or '').split())
+
+def _literal_value(value: Any) -> str:
+    """Python source for a Literal member; strings are always single-quoted."""
+    if not isinstance(value, str):
+        return repr(value)
+    source = repr(value)
+    if source.startswith('"'):
+        source = "'" + source[1:-1].replace("'", "\\'") + "'"
+    return source
+
+def literal_type(values: List[Any]) -> str:
+    """Literal annotation for enum values, or None if they cannot be Literal members."""
+    if not values or not all(value is None or isinstance(value, (str, int, bool)) for value in values):
+        return None
+    members = []
+    for value in values:
+        # True == 1 and False == 0, so compare by type as well as value
+        if value is not None and (type(value), value) not in [(type(m), m) for m in members]:
+            members.append(value)
+    if not members:
+        return None
+    return f"Literal[{', '.join(_literal_value(value) for value in members)}]"
+
+_LITERAL_STRINGS = re.compile(r"'(?:[^'\\]|\\.)*'")
+
+class SchemaResolver:
+    """Build model definitions from components/schemas.
+    
+    Follows $ref, merges allOf, turns oneOf/anyOf into unions and nested
+    objects into their own models. Every schema node is resolved once and
+    memoized, so shared nodes map to a single model. A reference back to a
+    component still being built becomes a forward reference instead of
+    being expanded again.
+    """
     
-    models = {}
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.schemas = (spec.get('components') or {}).get('schemas') or {}
+        self.models = {}
+        self.class_names = {}
+        self._used_names = set()
+        self._types = {}  # id(schema node) -> (schema node, py_type)
+        self._building = set()  # component names currently being resolved
+        self.recursive = set()  # models referenced before their definition
+        self._resolved = []  # class names in the order their definitions completed
+        for name in self.schemas:
+            self.class_names[name] = self._unique_name(name if str(name).isidentifier() else to_class_name(name))
     
-    # Extract components/schemas as models
-    if 'components' in spec and 'schemas' in spec['components']:
-        for model_name, schema in spec['components']['schemas'].items():
-            properties = schema.get('properties', {})
-            model_def = {
-                'properties': {},
-                'required': schema.get('required', [])
+    def _unique_name(self, class_name: str) -> str:
+        if keyword.iskeyword(class_name) or class_name in RESERVED_CLASS_NAMES:
+            class_name = f"{class_name}Model"
+        candidate, counter = class_name, 2
+        while candidate in self._used_names:
+            candidate = f"{class_name}{counter}"
+            counter += 1
+        self._used_names.add(candidate)
+        return candidate
+    
+    def iter_models(self):
+        """Yield (class_name, model_def) pairs as each component is resolved.
+        
+        Dependencies are yielded before the models that use them, and every
+        definition is final when yielded.
+        """
+        emitted = 0
+        for name in self.schemas:
+            self._component_model(name)
+            while emitted < len(self._resolved):
+                class_name = self._resolved[emitted]
+                emitted += 1
+                if class_name in self.recursive:
+                    self.models[class_name]['recursive'] = True
+                yield class_name, self.models[class_name]
+    
+    def resolve_all(self) -> Dict[str, Any]:
+        """Resolve every component schema; models are ordered so dependencies come first."""
+        for _ in self.iter_models():
+            pass
+        return self.models
+    
+    def _component_name(self, schema: Dict[str, Any]) -> str:
+        name = get_ref_model_name(schema)
+        return name if name in self.schemas else None
+    
+    def _deref(self, schema: Any) -> Dict[str, Any]:
+        return resolve_local_ref(self.spec, schema) if isinstance(schema, dict) else {}
+    
+    @staticmethod
+    def _is_object(schema: Dict[str, Any]) -> bool:
+        if 'properties' in schema or 'allOf' in schema:
+            return True
+        return schema.get('type') == 'object' and not isinstance(schema.get('additionalProperties'), dict)
+    
+    def _component_model(self, name: str) -> str:
+        class_name = self.class_names[name]
+        if class_name in self.models:
+            return class_name
+        if name in self._building:
+            # Recursive reference: refer to the class by name and rebuild it later
+            self.recursive.add(class_name)
+            return f'"{class_name}"'
+        
+        schema = self._deref(self.schemas[name])
+        self._building.add(name)
+        try:
+            if self._is_object(schema):
+                self._build_model(class_name, schema)
+            else:
+                root_type = self.type_for(schema, class_name)
+                self.models[class_name] = self._model_def(schema, root_type=root_type)
+                self._resolved.append(class_name)
+                self.models[class_name]['recursive'] = '"' in _LITERAL_STRINGS.sub('', root_type)
+        finally:
+            self._building.discard(name)
+        return class_name
+    
+    def _ref_type(self, name: str, hint: str) -> str:
+        schema = self._deref(self.schemas[name])
+        if self._is_object(schema):
+            return self._component_model(name)
+        # Scalars, arrays and unions are inlined where they are referenced
+        if name in self._building:
+            return 'Any'
+        self._building.add(name)
+        try:
+            return self.type_for(schema, self.class_names[name])
+        finally:
+            self._building.discard(name)
+    
+    def type_for(self, schema: Any, hint: str) -> str:
+        """Return the Python type annotation for a schema node."""
+        if not isinstance(schema, dict):
+            return 'Any'
+        if '$ref' in schema:
+            name = self._component_name(schema)
+            if name is not None:
+                return self._ref_type(name, hint)
+            return self.type_for(self._deref(schema), hint)
+        
+        # The node is stored with its type so its id cannot be reused while
+        # memoized, e.g. by the temporary schemas built for list-valued types
+        cached = self._types.get(id(schema))
+        if cached is None or cached[0] is not schema:
+            cached = self._types[id(schema)] = (schema, self._compute_type(schema, hint))
+        return cached[1]
+    
+    def _compute_type(self, schema: Dict[str, Any], hint: str) -> str:
+        nullable = bool(schema.get('nullable'))
+        schema_type = schema.get('type')
+        if isinstance(schema_type, list):
+            nullable = nullable or 'null' in schema_type
+            non_null = [t for t in schema_type if t != 'null']
+            if len(non_null) > 1:
+                return self._union([{**schema, 'type': t} for t in non_null], hint, nullable)
+            schema_type = non_null[0] if non_null else None
+        
+        if 'allOf' in schema:
+            parts = schema['allOf']
+            if len(parts) == 1 and not schema.get('properties'):
+                py_type = self.type_for(parts[0], hint)
+            else:
+                py_type = self._inline_model(hint, schema)
+        elif 'oneOf' in schema or 'anyOf' in schema:
+            return self._union(schema.get('oneOf') or schema.get('anyOf'), hint, nullable)
+        elif schema.get('properties'):
+            py_type = self._inline_model(hint, schema)
+        elif schema_type == 'object' or 'additionalProperties' in schema:
+            additional = schema.get('additionalProperties')
+            if isinstance(additional, dict) and additional:
+                py_type = f"Dict[str, {self.type_for(additional, f'{hint}Value')}]"
+            else:
+                py_type = "Dict[str, Any]"
+        elif schema_type == 'array':
+            items = schema.get('items')
+            py_type = f"List[{self.type_for(items, f'{hint}Item')}]" if items else "List[Any]"
+        elif literal_type(schema.get('enum')):
+            py_type = literal_type(schema['enum'])
+            nullable = nullable or None in schema['enum']
+        else:
+            py_type = convert_type_to_python(schema_type or 'string', schema.get('format'))
+        
+        return f"Optional[{py_type}]" if nullable else py_type
+    
+    def _union(self, options: List[Any], hint: str, nullable: bool) -> str:
+        members = []
+        for i, option in enumerate(options or []):
+            if isinstance(option, dict) and option.get('type') == 'null':
+                nullable = True
+                continue
+            py_type = self.type_for(option, f"{hint}Option{i + 1}")
+            if py_type not in members:
+                members.append(py_type)
+        if not members:
+            py_type = 'Any'
+        elif len(members) == 1:
+            py_type = members[0]
+        else:
+            py_type = f"Union[{', '.join(members)}]"
+        return f"Optional[{py_type}]" if nullable and py_type != 'Any' else py_type
+    
+    def _inline_model(self, hint: str, schema: Dict[str, Any]) -> str:
+        class_name = self._unique_name(hint)
+        self._build_model(class_name, schema)
+        return class_name
+    
+    def _collect_object(self, schema: Dict[str, Any], seen: set) -> tuple:
+        """Merge properties and required names across allOf parts."""
+        if '$ref' in schema:
+            if schema['$ref'] in seen:
+                return {}, []
+            seen = seen | {schema['$ref']}
+            schema = self._deref(schema)
+        properties, required = {}, []
+        for part in schema.get('allOf') or []:
+            part_properties, part_required = self._collect_object(part if isinstance(part, dict) else {}, seen)
+            properties.update(part_properties)
+            required.extend(part_required)
+        properties.update(schema.get('properties') or {})
+        required.extend(schema.get('required') or [])
+        return properties, list(dict.fromkeys(required))
+    
+    def _model_def(self, schema: Dict[str, Any], root_type: str = None) -> Dict[str, Any]:
+        return {
+            'properties': {},
+            'required': [],
+            'root_type': root_type,
+            'recursive': False,
+            'description': _single_line(schema.get('description')),
+        }
+    
+    def _build_model(self, class_name: str, schema: Dict[str, Any]):
+        properties, required = self._collect_object(schema, set())
+        model_def = self._model_def(schema)
+        model_def['required'] = required
+        
+        field_names = set()
+        for prop_name, prop_schema in properties.items():
+            target = self._deref(prop_schema)
+            py_type = self.type_for(prop_schema, f"{class_name}{to_class_name(prop_name)}")
+            
+            field_name = to_field_name(prop_name)
+            # Likewise a field named after a model would shadow it in later annotations
+            while field_name in field_names or field_name in self._used_names:
+                field_name = f"{field_name}_"
+            field_names.add(field_name)
+            
+            field_def = {
+                'type': self._openapi_type(target),
+                'py_type': py_type,
+                'description': _single_line((prop_schema.get('description') if isinstance(prop_schema, dict) else None) or target.get('description')),
+                'field_name': field_name,
             }
+            if field_name != prop_name:
+                field_def['alias'] = prop_name
+            if 'enum' in target:
+                field_def['enum'] = target['enum']
+            # Literal values are not type names
+            type_names = _LITERAL_STRINGS.sub('', py_type)
+            referenced = [name for name in re.findall(r'[A-Za-z_][A-Za-z0-9_]*', type_names) if name in self._used_names]
+            if len(referenced) == 1:
+                field_def['model'] = referenced[0]
+            if '"' in type_names:
+                # Holds a forward reference that needs a rebuild
+                model_def['recursive'] = True
+            model_def['properties'][prop_name] = field_def
+        
+        self.models[class_name] = model_def
+        self._resolved.append(class_name)
+    
+    @staticmethod
+    def _openapi_type(schema: Dict[str, Any]) -> str:
+        schema_type = schema.get('type')
+        if isinstance(schema_type, list):
+            non_null = [t for t in schema_type if t != 'null']
+            schema_type = non_null[0] if len(non_null) == 1 else None
+        if schema_type:
+            return schema_type
+        if 'properties' in schema or 'allOf' in schema or 'additionalProperties' in schema:
+            return 'object'
+        if 'items' in schema:
+            return 'array'
+        if 'oneOf' in schema or 'anyOf' in schema:
+            return 'union'
+        return 'string'
+
+def parse_rate_limit(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize the root x-mcp-rate-limit extension into rate, burst and concurrency."""
+    limit = spec.get('x-mcp-rate-limit') or {}
+    requests = float(limit.get('requests') or 0)
+    period = float(limit.get('period') or 1)
+    rate = requests / period if requests > 0 else 0.0
+    return {
+        'rate': rate,
+        # Default to one second's worth of requests so bursts are smoothed
+        'burst': int(limit.get('burst') or max(1, int(rate + 0.999))),
+        'concurrency': int(limit.get('concurrency') or 0),
+    }
+
+def parse_operations(spec: Dict[str, Any], model_names: Dict[str, str] = None) -> List[Dict[str, Any]]:
+    """Extract upstream operations from the spec paths.
+    
+    model_names maps component schema names to generated class names.
+    """
+    model_names = model_names or {}
+    operations = []
+    used_ids = set()
+    
+    for path, path_item in (spec.get('paths') or {}).items():
+        path_item = resolve_local_ref(spec, path_item)
+        path_params = path_item.get('parameters', [])
+        
+        for method in HTTP_METHODS:
+            if method not in path_item:
+                continue
+            operation = path_item[method]
+            
+            op_id = get_operation_id(method, path, operation)
+            while op_id in used_ids:
+                op_id = f"{op_id}_{method}"
+            used_ids.add(op_id)
+            
+            # Operation-level parameters override path-level ones
+            merged = {}
+            for param in path_params + operation.get('parameters', []):
+                param = resolve_local_ref(spec, param)
+                if 'name' not in param or 'in' not in param:
+                    continue
+                if param['in'] not in PARAM_LOCATIONS:
+                    print(f"Skipping parameter {param['name']!r} of {op_id}: unsupported location {param['in']!r}")
+                    continue
+                merged[(param['name'], param['in'])] = param
+            
+            params = []
+            for (name, location), param in merged.items():
+                schema = resolve_local_ref(spec, param.get('schema', {}))
+                param_def = {
+                    'name': name,
+                    'in': location,
+                    'required': bool(param.get('required', location == 'path')),
+                    'type': schema.get('type', 'string'),
+                    'py_type': convert_type_to_python(schema.get('type', 'string'), schema.get('format'), schema.get('items')),
+                    'description': param.get('description', ''),
+                }
+                if 'default' in schema:
+                    param_def['default'] = schema['default']
+                if 'enum' in schema:
+                    param_def['enum'] = schema['enum']
+                params.append(param_def)
             
-            for prop_name, prop_def in properties.items():
-                prop_type = prop_def.get('type', 'string')
-                prop_format = prop_def.get('format')
-                prop_items = prop_def.get('items')
-                
-                model_def['properties'][prop_name] = {
-                    'type': prop_type,
-                    'py_type': convert_type_to_python(prop_type, prop_format, prop_items),
-                    'description': prop_def.get('description', ''),
+            body = None
+            if 'requestBody' in operation:
+                request_body = resolve_local_ref(spec, operation['requestBody'])
+                body_schema = get_json_schema(request_body.get('content'))
+                body_model = get_ref_model_name(body_schema)
+                body = {
+                    'required': bool(request_body.get('required', False)),
+                    'model': model_names.get(body_model, body_model),
                 }
-                
-                if 'enum' in prop_def:
-                    model_def['properties'][prop_name]['enum'] = prop_def['enum']
             
-            models[model_name] = model_def
+            response_model = None
+            responses = operation.get('responses') or {}
+            for status in ('200', '201', '202', 'default'):
+                if status in responses:
+                    response = resolve_local_ref(spec, responses[status])
+                    response_model = get_ref_model_name(get_json_schema(response.get('content')))
+                    response_model = model_names.get(response_model, response_model)
+                    break
+            
+            # Retried on throttling and transient failures only when safe to repeat
+            idempotent = operation.get('x-mcp-idempotent', method.upper() in IDEMPOTENT_METHODS)
+            
+            # Relay the upstream body as it arrives instead of buffering it
+            stream = operation.get('x-mcp-stream', path_item.get('x-mcp-stream', spec.get('x-mcp-stream', False)))
+            
+            # Only idempotent GET responses are cached
+            cache_ttl = 0
+            if method == 'get':
+                cache_ttl = operation.get('x-mcp-cache-ttl', path_item.get('x-mcp-cache-ttl', spec.get('x-mcp-cache-ttl', 0)))
+            
+            operations.append({
+                'operation_id': op_id,
+                'method': method.upper(),
+                'path': path,
+                'summary': operation.get('summary', ''),
+                'description': operation.get('description', ''),
+                'params': params,
+                'body': body,
+                'response_model': response_model,
+                'cache_ttl': float(cache_ttl or 0),
+                'idempotent': bool(idempotent),
+                'stream': bool(stream),
+                'tags': list(operation.get('tags') or []),
+            })
+    
+    return operations
+
+# Parsed specs for this run, keyed by (absolute path, mtime, size); one version per path
+_loaded_specs = {}
+
+def _parse_spec_bytes(spec_path: str, data: bytes) -> Dict[str, Any]:
+    if spec_path.endswith('.json'):
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    return yaml.load(data, Loader=SpecLoader)
+
+def load_spec(spec_path: str) -> Dict[str, Any]:
+    """Load an OpenAPI spec, parsing each file at most once per run.
+    
+    JSON specs use orjson (or json), YAML specs use libyaml when available.
+    When spec_cache_dir is set, parsed trees are also pickled there, keyed
+    by the SHA-256 of the file content.
+    """
+    stat = os.stat(spec_path)
+    key = (os.path.abspath(spec_path), stat.st_mtime_ns, stat.st_size)
+    spec = _loaded_specs.get(key)
+    if spec is not None:
+        return spec
+    
+    with open(spec_path, 'rb') as f:
+        data = f.read()
+    
+    cache_path = None
+    if spec_cache_dir:
+        cache_path = os.path.join(spec_cache_dir, f"{hashlib.sha256(data).hexdigest()}.pickle")
+        try:
+            with open(cache_path, 'rb') as f:
+                spec = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            spec = None
+    
+    if spec is None:
+        spec = _parse_spec_bytes(spec_path, data)
+        if cache_path:
+            os.makedirs(spec_cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(spec, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+    
+    # An edited file replaces its earlier tree, so long-running processes that
+    # reload specs (e.g. the gateway) do not keep every version in memory
+    for stale in [k for k in list(_loaded_specs) if k[0] == key[0]]:
+        _loaded_specs.pop(stale, None)
+    _loaded_specs[key] = spec
+    return spec
+
+# --- Streaming Spec Loading ---
+# Top-level sections and components the generator reads
+SPEC_SECTIONS = {'openapi', 'swagger', 'info', 'servers', 'paths', 'components'}
+COMPONENT_SECTIONS = {'schemas', 'securitySchemes', 'parameters', 'requestBodies', 'responses', 'pathItems'}
+# Skipped wherever they appear, except as names in these mappings
+SKIPPED_KEYS = {'example', 'examples'}
+NAMED_MAPPINGS = {'properties', 'schemas', 'securitySchemes', 'parameters', 'requestBodies', 'responses', 'pathItems'}
+
+_NO_KEY = object()  # a mapping frame waiting for its next key
+
+class StreamingUnsupported(Exception):
+    """Raised for YAML the event loader does not handle; the caller falls back to a full load."""
+
+def _keep_key(path: tuple, key: Any) -> bool:
+    if not path:
+        return key in SPEC_SECTIONS or str(key).startswith('x-mcp')
+    if path == ('components',):
+        return key in COMPONENT_SECTIONS
+    return key not in SKIPPED_KEYS or path[-1] in NAMED_MAPPINGS
+
+def _iter_spec_sections(spec_file) -> Dict[str, Any]:
+    """Build the kept parts of a spec from PyYAML parse events."""
+    constructor = yaml.constructor.SafeConstructor()
+    resolver = yaml.resolver.Resolver()
+    anchors = {}
+    stack = []  # [container, path, pending key] per open mapping or sequence
+    root = None
+    skip_next = False
+    skipping = 0  # nesting depth inside a skipped value
+    
+    def scalar(event):
+        tag = event.tag if event.tag not in (None, '!') else resolver.resolve(yaml.ScalarNode, event.value, event.implicit)
+        construct = constructor.yaml_constructors.get(tag)
+        if construct is None or tag == 'tag:yaml.org,2002:merge':
+            raise StreamingUnsupported(f"tag {tag}")
+        return construct(constructor, yaml.ScalarNode(tag, event.value, style=event.style))
+    
+    def attach(value, event):
+        """Place a key or value into the open container."""
+        nonlocal root, skip_next
+        if getattr(event, 'anchor', None):
+            anchors[event.anchor] = value
+        if not stack:
+            root = value
+            return
+        frame = stack[-1]
+        container, path, key = frame
+        if isinstance(container, list):
+            container.append(value)
+        elif key is not _NO_KEY:
+            container[key] = value
+            frame[2] = _NO_KEY
+        elif isinstance(value, (dict, list)):
+            raise StreamingUnsupported("complex mapping key")
+        elif _keep_key(path, value):
+            frame[2] = value
+        else:
+            skip_next = True
+    
+    for event in yaml.parse(spec_file, Loader=SpecLoader):
+        if skipping:
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                skipping += 1
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                skipping -= 1
+            continue
+        if skip_next:
+            skip_next = False
+            if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                skipping = 1
+            continue
+        
+        if isinstance(event, yaml.ScalarEvent):
+            attach(scalar(event), event)
+        elif isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            container = {} if isinstance(event, yaml.MappingStartEvent) else []
+            parent_path = stack[-1][1] + (stack[-1][2] if isinstance(stack[-1][0], dict) else None,) if stack else ()
+            attach(container, event)
+            stack.append([container, parent_path, _NO_KEY])
+        elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            stack.pop()
+        elif isinstance(event, yaml.AliasEvent):
+            if event.anchor not in anchors:
+                raise StreamingUnsupported(f"alias *{event.anchor} into a skipped section")
+            attach(anchors[event.anchor], event)
+        elif isinstance(event, yaml.DocumentEndEvent) and root is not None:
+            break
+    return root if isinstance(root, dict) else {}
+
+def _prune_sections(node: Any, path: tuple = ()) -> Any:
+    """Drop the keys _keep_key rejects from an already parsed tree."""
+    if isinstance(node, dict):
+        return {key: _prune_sections(value, path + (key,)) for key, value in node.items() if _keep_key(path, key)}
+    if isinstance(node, list):
+        return [_prune_sections(value, path + (None,)) for value in node]
+    return node
+
+def load_spec_sections(spec_path: str) -> Dict[str, Any]:
+    """Load only the parts of a spec the generator uses, without building the full tree.
+    
+    YAML is read as a stream of parse events, so skipped sections (examples,
+    tags, webhooks, unused components, other extensions) are never turned into
+    Python objects. JSON is parsed in one pass by orjson, which is faster and
+    smaller than the event parser, then pruned the same way. Nothing is
+    memoized, so memory is released after parsing. Falls back to load_spec for
+    YAML features the event loader does not handle.
+    """
+    if spec_path.endswith('.json'):
+        with open(spec_path, 'rb') as f:
+            return _prune_sections(_parse_spec_bytes(spec_path, f.read()))
+    try:
+        with open(spec_path, 'rb') as f:
+            return _iter_spec_sections(f)
+    except StreamingUnsupported:
+        return load_spec(spec_path)
+
+def load_spec_bytes(data) -> Dict[str, Any]:
+    """Parse a spec held in memory; JSON (with orjson when installed) or YAML, told apart by the first character."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return _parse_spec_bytes('spec.json' if data.lstrip()[:1] in (b'{', b'[') else 'spec.yaml', data)
+
+def parse_openapi_spec(spec_path: str, streaming: bool = False) -> Dict[str, Any]:
+    """Parse OpenAPI spec and extract models.
+    
+    With streaming, only the needed sections are loaded (see load_spec_sections).
+    """
+    spec = load_spec_sections(spec_path) if streaming else load_spec(spec_path)
+    return parse_spec_dict(spec)
+
+def parse_spec_dict(spec: Dict[str, Any], resolver: "SchemaResolver" = None) -> Dict[str, Any]:
+    """Build the template context from an already loaded spec. The spec is not modified.
+    
+    A resolver whose models are already resolved can be passed in, e.g. to time model resolution separately.
+    """
+    # Extract components/schemas (and the nested objects they contain) as models
+    resolver = resolver or SchemaResolver(spec)
+    models = resolver.resolve_all()
     
     # Extract API info
     api_info = {
@@ -98,7 +777,9 @@ def parse_openapi_spec(spec_path: str) -> Dict[str, Any]:
         'models': models,
         'api_info': api_info,
         'security_schemes': security_schemes,
-        'servers': servers
+        'servers': servers,
+        'operations': parse_operations(spec, resolver.class_names),
+        'rate_limit': parse_rate_limit(spec),
     }
 
 def get_api_name_from_spec(spec_path: str) -> str:
@@ -111,48 +792,557 @@ def get_api_name_from_spec(spec_path: str) -> str:
     
     # If not possible, try to get from spec content
     try:
-        with open(spec_path, 'r') as f:
-            spec = yaml.safe_load(f)
-            if 'info' in spec and 'title' in spec['info']:
-                # Convert title to snake_case
-                title = spec['info']['title']
-                return re.sub(r'[^a-zA-Z0-9]', '_', title).lower()
+        spec = load_spec(spec_path)
+        if 'info' in spec and 'title' in spec['info']:
+            # Convert title to snake_case
+            title = spec['info']['title']
+            return re.sub(r'[^a-zA-Z0-9]', '_', title).lower()
     except:
         pass
     
     # Default fallback
     return "api"
 
-def generate_mcp_server(spec_path: str, output_path: str = None):
-    """Generate MCP server from OpenAPI spec."""
-    # Parse OpenAPI spec
-    context = parse_openapi_spec(spec_path)
+def _sha256_file(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _sha256_output(output_path: str) -> str:
+    """Hash a generated file, or every module of a generated package."""
+    if not os.path.isdir(output_path):
+        return _sha256_file(output_path)
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(output_path, '**', '*.py'), recursive=True)):
+        digest.update(os.path.relpath(path, output_path).replace(os.sep, '/').encode())
+        digest.update(b'\0')
+        digest.update(_sha256_file(path).encode())
+    return digest.hexdigest()
+
+def compute_build_hash(spec_path: str, template_dir: str = None, options: Dict[str, Any] = None) -> str:
+    """Hash everything a generated server depends on, including every template."""
+    digest = hashlib.sha256()
+    digest.update(GENERATOR_VERSION.encode())
+    digest.update(json.dumps(options or {}, sort_keys=True).encode())
+    templates = [path for directory in template_search_path(template_dir)
+                 for path in sorted(glob.glob(os.path.join(directory, '*.j2')))]
+    for path in [os.path.abspath(__file__)] + templates + [spec_path]:
+        digest.update(b'\0')
+        digest.update(_sha256_file(path).encode())
+    return digest.hexdigest()
+
+def load_build_cache(cache_path: str = BUILD_CACHE_FILE) -> Dict[str, Any]:
+    """Load the build cache, treating a missing or corrupt file as empty."""
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def save_build_cache(cache: Dict[str, Any], cache_path: str = BUILD_CACHE_FILE):
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+def write_if_changed(output_path: str, content: str) -> bool:
+    """Write content unless the file already holds it, preserving its mtime."""
+    data = content.encode('utf-8')
+    try:
+        with open(output_path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    return True
+
+def write_chunks_if_changed(output_path: str, chunks) -> tuple:
+    """Stream rendered chunks to disk, keeping the existing file if it is identical.
     
-    # Get API name if output_path is not specified
-    if not output_path:
-        api_name = get_api_name_from_spec(spec_path)
-        output_path = f"mcp_server_{api_name}.py"
+    Returns (changed, SHA-256 of the content).
+    """
+    digest = hashlib.sha256()
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            digest.update(chunk.encode('utf-8'))
+    output_hash = digest.hexdigest()
+    if os.path.exists(output_path) and _sha256_file(output_path) == output_hash:
+        os.remove(tmp_path)
+        return False, output_hash
+    os.replace(tmp_path, output_path)
+    return True, output_hash
+
+def write_package_if_changed(output_path: str, files: Dict[str, str]) -> tuple:
+    """Write a package's modules, removing modules left over from earlier builds.
+    
+    Returns (changed, hash of the package as computed by _sha256_output).
+    """
+    changed = False
+    for relative_path, content in files.items():
+        path = os.path.join(output_path, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        changed = write_if_changed(path, content) or changed
+    for path in glob.glob(os.path.join(output_path, '**', '*.py'), recursive=True):
+        if os.path.relpath(path, output_path).replace(os.sep, '/') not in files:
+            os.remove(path)
+            changed = True
+    return changed, _sha256_output(output_path)
+
+def template_search_path(template_dir: str = None) -> List[str]:
+    """Directories searched for templates: a custom directory first, then the built-in one."""
+    if not template_dir or os.path.abspath(template_dir) == TEMPLATE_DIR:
+        return [TEMPLATE_DIR]
+    return [os.path.abspath(template_dir), TEMPLATE_DIR]
+
+_environments = {}
+_environments_lock = threading.Lock()
+
+def get_environment(template_dir: str = None) -> Environment:
+    """Return the Jinja environment for a template directory, creating it once per process.
+    
+    Environments keep compiled templates in memory, and compiled bytecode is
+    also cached on disk, so a new process skips compiling unchanged templates.
+    """
+    search_path = tuple(template_search_path(template_dir))
+    env = _environments.get(search_path)
+    if env is None:
+        with _environments_lock:
+            env = _environments.get(search_path)
+            if env is None:
+                env = Environment(loader=FileSystemLoader(list(search_path)),
+                                  bytecode_cache=FileSystemBytecodeCache(template_cache_dir))
+                env.filters['pyrepr'] = repr
+                _environments[search_path] = env
+    return env
+
+def get_template(name: str = TEMPLATE_NAME, template_dir: str = None):
+    """Return a compiled template; templates in template_dir override the built-in ones."""
+    return get_environment(template_dir).get_template(name)
+
+def default_output_path(spec_path: str, output_dir: str = None, package: bool = False) -> str:
+    """Output path for a spec: mcp_server_<api>.py, or a mcp_server_<api> package directory."""
+    api_name = get_api_name_from_spec(spec_path)
+    return os.path.join(output_dir or '', f"mcp_server_{api_name}" if package else f"mcp_server_{api_name}.py")
+
+# Suffixes keeping in-memory module names unique across threads
+_module_ids = itertools.count()
+
+def load_server_source(source: str, module_name: str) -> types.ModuleType:
+    """Execute rendered server source as a new module, without writing it to disk."""
+    module = types.ModuleType(module_name)
+    # pydantic resolves the models' module through sys.modules
+    sys.modules[module_name] = module
+    try:
+        exec(compile(source, f'<{module_name}>', 'exec'), module.__dict__)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
+
+def load_server_module(module_name: str, server_path: str) -> types.ModuleType:
+    """Import a generated server file under the given module name."""
+    module_spec = importlib.util.spec_from_file_location(module_name, server_path)
+    module = importlib.util.module_from_spec(module_spec)
+    # pydantic resolves the models' module through sys.modules
+    sys.modules[module_name] = module
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            module_spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
+
+def compute_openapi(source: str) -> Dict[str, Any]:
+    """Import rendered server source and return its FastAPI OpenAPI document, or None if FastAPI is missing."""
+    module_name = f'_mcp_openapi_probe_{next(_module_ids)}'
+    try:
+        return load_server_source(source, module_name).app.openapi()
+    except ImportError as e:
+        print(f"Skipping precomputed OpenAPI document: {e}")
+        return None
+    finally:
+        sys.modules.pop(module_name, None)
+
+def _render_context(context: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(context, lazy_models=bool(options.get('fast_startup')), strict=bool(options.get('strict')),
+                package=bool(options.get('package')))
+
+# --- Package Output ---
+def model_references(model_def: Dict[str, Any], model_names) -> set:
+    """Names of the models a model's fields (or root type) refer to."""
+    types = [field_def['py_type'] for field_def in model_def['properties'].values()]
+    if model_def.get('root_type'):
+        types.append(model_def['root_type'])
+    references = set()
+    for py_type in types:
+        references.update(name for name in re.findall(r'[A-Za-z_][A-Za-z0-9_]*', _LITERAL_STRINGS.sub('', py_type))
+                          if name in model_names)
+    return references
+
+def _module_name(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', str(text).lower()).strip('_') or 'untagged'
+
+def shard_models(context: Dict[str, Any], shard_by: str = 'tag') -> tuple:
+    """Assign every model to a shard module.
     
-    # Set up Jinja environment
-    env = Environment(loader=FileSystemLoader('templates'))
-    template = env.get_template('mcp_server.py.j2')
+    By tag, a model goes to the shard of the one tag whose operations use it
+    (directly or through other models), and to `common` otherwise. By alpha,
+    sorted model names are split into buckets of SHARD_SIZE.
+    Returns ({class name: shard}, {shard: description}).
+    """
+    models = context['models']
+    if shard_by == 'alpha':
+        names = sorted(models, key=str.lower)
+        shards, labels = {}, {}
+        for start in range(0, len(names), SHARD_SIZE):
+            bucket = names[start:start + SHARD_SIZE]
+            shard = f"shard_{start // SHARD_SIZE:03d}"
+            labels[shard] = f"{bucket[0]} to {bucket[-1]}"
+            for name in bucket:
+                shards[name] = shard
+        return shards, labels
     
-    # Render template
+    references = {name: model_references(model_def, models) for name, model_def in models.items()}
+    users = {name: set() for name in models}  # class name -> tags whose operations reach it
+    for op in context['operations']:
+        roots = [model for model in ((op['body'] or {}).get('model'), op['response_model']) if model in models]
+        for tag in op.get('tags') or []:
+            stack = list(roots)
+            while stack:
+                name = stack.pop()
+                if tag not in users[name]:
+                    users[name].add(tag)
+                    stack.extend(references[name])
+    shards, labels = {}, {'common': "models shared by several tags or used by none"}
+    for name in models:
+        if len(users[name]) == 1:
+            tag = next(iter(users[name]))
+            shard = f"tag_{_module_name(tag)}"
+            labels.setdefault(shard, f"models used by {tag} operations")
+        else:
+            shard = 'common'
+        shards[name] = shard
+    return shards, {shard: label for shard, label in labels.items() if shard in shards.values()}
+
+def _quote_models(py_type: str, names) -> str:
+    """Turn references to the given models into forward references, leaving Literal values alone."""
+    pattern = re.compile(r'(?<!["\w])(' + '|'.join(map(re.escape, sorted(names))) + r')(?![\w"])')
+    parts, last = [], 0
+    for literal in _LITERAL_STRINGS.finditer(py_type):
+        parts.append(pattern.sub(r'"\1"', py_type[last:literal.start()]))
+        parts.append(literal.group())
+        last = literal.end()
+    parts.append(pattern.sub(r'"\1"', py_type[last:]))
+    return ''.join(parts)
+
+def render_package(context: Dict[str, Any], options: Dict[str, Any], package_name: str) -> Dict[str, str]:
+    """Render a server as a package: {relative path: source}.
+    
+    app.py holds the server, models/ one module per shard plus a registry
+    that imports a shard when one of its models is first looked up.
+    Models referring to another shard's models do so through forward
+    references, so shards can be imported in any order.
+    """
+    context = _render_context(context, options)
+    model_shards, labels = shard_models(context, options.get('package'))
+    template_dir = options.get('template_dir')
+    files = {
+        '__init__.py': get_template('package_init.py.j2', template_dir).render(**context, package_name=package_name),
+        'app.py': render_server(context, options),
+        'models/__init__.py': get_template('models_package.py.j2', template_dir).render(**context, model_shards=model_shards),
+    }
+    for shard, label in labels.items():
+        shard_defs = {}
+        external = {}
+        for name, model_def in context['models'].items():
+            if model_shards[name] != shard:
+                continue
+            outside = {ref for ref in model_references(model_def, context['models']) if model_shards[ref] != shard}
+            if outside:
+                model_def = dict(model_def, properties={
+                    prop: dict(field_def, py_type=_quote_models(field_def['py_type'], outside))
+                    for prop, field_def in model_def['properties'].items()
+                })
+                if model_def.get('root_type'):
+                    model_def['root_type'] = _quote_models(model_def['root_type'], outside)
+                external.update((ref, model_shards[ref]) for ref in sorted(outside))
+            shard_defs[name] = model_def
+        files[f'models/{shard}.py'] = get_template('models_shard.py.j2', template_dir).render(
+            **dict(context, models=shard_defs), shard_label=label, external_models=external)
+    return files
+
+def render_server(context: Dict[str, Any], options: Dict[str, Any] = None) -> str:
+    """Render server source from a parsed spec.
+    
+    With the fast_startup option, models are built lazily on first use and
+    the OpenAPI document is computed now and embedded in the output. The
+    strict option makes strict validation the models' and server's default.
+    """
+    options = options or {}
+    context = _render_context(context, options)
+    template = get_template(TEMPLATE_NAME, options.get('template_dir'))
     output = template.render(**context)
+    if options.get('fast_startup'):
+        # Routes take untyped arguments, so the OpenAPI document does not depend
+        # on the models; a package's app cannot be probed on its own anyway
+        probe = template.render(**dict(context, models={}, package=False)) if context['package'] else output
+        openapi = compute_openapi(probe)
+        if openapi is not None:
+            output = template.render(**context, openapi_json=json.dumps(openapi, separators=(',', ':')))
+    return output
+
+def measure_import(output_path: str, repeat: int = 5) -> Dict[str, float]:
+    """Time importing a generated server in fresh interpreters, best of `repeat`.
+    
+    Returns seconds spent importing its dependencies and running the module body.
+    """
+    script = (
+        "import os, sys, time, importlib, importlib.util\n"
+        "started = time.perf_counter()\n"
+        "import fastapi, pydantic, httpx\n"
+        "loaded = time.perf_counter()\n"
+        "if os.path.isdir(sys.argv[1]):\n"
+        "    package_dir, package = os.path.split(os.path.abspath(sys.argv[1]))\n"
+        "    sys.path.insert(0, package_dir)\n"
+        "    importlib.import_module(package + '.app')\n"
+        "else:\n"
+        "    spec = importlib.util.spec_from_file_location('mcp_server_import_probe', sys.argv[1])\n"
+        "    module = importlib.util.module_from_spec(spec)\n"
+        "    sys.modules[spec.name] = module\n"
+        "    spec.loader.exec_module(module)\n"
+        "print(loaded - started, time.perf_counter() - loaded)\n"
+    )
+    best = {'dependencies': float('inf'), 'module': float('inf')}
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-W', 'ignore', '-c', script, output_path],
+                                capture_output=True, text=True, check=True)
+        dependencies, module = (float(value) for value in result.stdout.split()[-2:])
+        best['dependencies'] = min(best['dependencies'], dependencies)
+        best['module'] = min(best['module'], module)
+    return best
+
+def build_server(spec_path: str, output_path: str, force: bool = False, cache_entry: Dict[str, Any] = None,
+                 options: Dict[str, Any] = None):
+    """Render one server, returning (status, new cache entry).
+    
+    Status is 'up to date' when the cache entry shows nothing changed,
+    'unchanged' when the rendered output matched the existing file, and
+    'generated' when the file was written.
+    """
+    options = options or {}
+    build_hash = compute_build_hash(spec_path, options.get('template_dir'), options)
     
-    # Write output
-    with open(output_path, 'w') as f:
-        f.write(output)
+    if not force and cache_entry and cache_entry.get('build_hash') == build_hash and os.path.exists(output_path):
+        if _sha256_output(output_path) == cache_entry.get('output_hash'):
+            return 'up to date', cache_entry
     
-    print(f"Generated MCP server at {output_path}")
+    # Parse OpenAPI spec and render template
+    context = parse_openapi_spec(spec_path, streaming=bool(options.get('streaming')))
+    if options.get('package'):
+        package_name = os.path.basename(os.path.normpath(output_path))
+        changed, output_hash = write_package_if_changed(output_path, render_package(context, options, package_name))
+    elif options.get('streaming') and not options.get('fast_startup'):
+        # Rendered chunks go straight to disk instead of being joined in memory
+        template = get_template(TEMPLATE_NAME, options.get('template_dir'))
+        changed, output_hash = write_chunks_if_changed(output_path, template.generate(**_render_context(context, options)))
+    else:
+        output = render_server(context, options)
+        changed = write_if_changed(output_path, output)
+        output_hash = hashlib.sha256(output.encode('utf-8')).hexdigest()
+    
+    status = 'generated' if changed else 'unchanged'
+    return status, {
+        'build_hash': build_hash,
+        'output_hash': output_hash,
+    }
+
+def generate_mcp_server(spec_path: str, output_path: str = None, force: bool = False, options: Dict[str, Any] = None):
+    """Generate MCP server from OpenAPI spec.
+    
+    Unless force is set, specs whose spec, template and generator are
+    unchanged since the last build are skipped without being parsed.
+    """
+    # Get API name if output_path is not specified
+    if not output_path:
+        output_path = default_output_path(spec_path, package=bool((options or {}).get('package')))
+    
+    build_cache = load_build_cache()
+    cache_key = os.path.abspath(output_path)
+    status, build_cache[cache_key] = build_server(spec_path, output_path, force, build_cache.get(cache_key), options)
+    save_build_cache(build_cache)
+    
+    if status == 'generated':
+        print(f"Generated MCP server at {output_path}")
+    else:
+        print(f"MCP server at {output_path} is {status}")
     return output_path
 
+# --- Library API ---
+# In-memory generation for callers that already hold the spec. Everything here
+# is safe to call from several threads at once.
+def parse_spec(spec) -> Dict[str, Any]:
+    """Parse a spec given as a dict, or as JSON or YAML bytes or text, into the template context."""
+    if isinstance(spec, (bytes, bytearray, str)):
+        spec = load_spec_bytes(bytes(spec) if isinstance(spec, bytearray) else spec)
+    return parse_spec_dict(spec)
+
+def _api_slug(context: Dict[str, Any]) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', context['api_info']['title'].lower()).strip('_') or 'api'
+
+def render_source(spec, options: Dict[str, Any] = None):
+    """Render server source for a spec (dict, bytes or text) without touching the disk.
+    
+    Returns the module source, or {relative path: source} with the package option.
+    """
+    options = options or {}
+    context = parse_spec(spec)
+    if options.get('package'):
+        return render_package(context, options, f"mcp_server_{_api_slug(context)}")
+    return render_server(context, options)
+
+def build_server_module(spec, options: Dict[str, Any] = None) -> types.ModuleType:
+    """Render a server for a spec and execute it as a fresh module, with no file written.
+    
+    The module is registered in sys.modules under a unique name, since pydantic
+    looks models up there; pop it once the server is no longer needed.
+    """
+    options = options or {}
+    if options.get('package'):
+        raise ValueError("Package output cannot be built in memory; use render_source")
+    context = parse_spec(spec)
+    return load_server_source(render_server(context, options), f"mcp_server_{_api_slug(context)}_{next(_module_ids)}")
+
+def build_app(spec, options: Dict[str, Any] = None):
+    """Return a live FastAPI app for a spec; its module is available as app.state.server_module."""
+    module = build_server_module(spec, options)
+    module.app.state.server_module = module
+    return module.app
+
+def release_app(app) -> None:
+    """Drop a build_app module from sys.modules once its app is no longer served."""
+    module = getattr(app.state, 'server_module', None)
+    if module is not None:
+        sys.modules.pop(module.__name__, None)
+
+def expand_spec_paths(pattern: str) -> List[str]:
+    """Expand a spec file, directory or glob pattern into spec paths."""
+    if os.path.isdir(pattern):
+        paths = []
+        for extension in ('*.yaml', '*.yml', '*.json'):
+            paths.extend(glob.glob(os.path.join(pattern, extension)))
+        return sorted(paths)
+    if any(char in pattern for char in '*?['):
+        return sorted(glob.glob(pattern))
+    return [pattern]
+
+def _init_worker(cache_dir: str, template_dir: str = None, bytecode_dir: str = None):
+    global spec_cache_dir, template_cache_dir
+    spec_cache_dir = cache_dir
+    template_cache_dir = bytecode_dir
+    # Each worker loads the template once up front and reuses it
+    get_template(TEMPLATE_NAME, template_dir)
+
+def _build_server_timed(spec_path: str, output_path: str, force: bool, cache_entry: Dict[str, Any],
+                        options: Dict[str, Any] = None):
+    started = time.perf_counter()
+    try:
+        status, entry = build_server(spec_path, output_path, force, cache_entry, options)
+        error = None
+    except Exception as e:
+        status, entry, error = 'failed', cache_entry, f"{type(e).__name__}: {e}"
+    return status, entry, error, time.perf_counter() - started
+
+def generate_many(spec_paths: List[str], output_dir: str = None, workers: int = None, force: bool = False,
+                  options: Dict[str, Any] = None) -> bool:
+    """Generate servers for many specs in a process pool and print a timing summary.
+    
+    Returns True when every spec was generated successfully.
+    """
+    started = time.perf_counter()
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    package = bool((options or {}).get('package'))
+    jobs = [(spec_path, default_output_path(spec_path, output_dir, package)) for spec_path in spec_paths]
+    build_cache = load_build_cache()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    
+    if workers == 1:
+        results = [_build_server_timed(spec_path, output_path, force, build_cache.get(os.path.abspath(output_path)), options)
+                   for spec_path, output_path in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(spec_cache_dir, (options or {}).get('template_dir'), template_cache_dir)) as pool:
+            futures = [pool.submit(_build_server_timed, spec_path, output_path, force, build_cache.get(os.path.abspath(output_path)), options)
+                       for spec_path, output_path in jobs]
+            results = [future.result() for future in futures]
+    
+    ok = True
+    width = max(len(spec_path) for spec_path, _ in jobs)
+    for (spec_path, output_path), (status, entry, error, seconds) in zip(jobs, results):
+        if entry:
+            build_cache[os.path.abspath(output_path)] = entry
+        if error:
+            ok = False
+            print(f"{spec_path:<{width}}  {seconds * 1000:8.1f} ms  failed: {error}")
+        else:
+            print(f"{spec_path:<{width}}  {seconds * 1000:8.1f} ms  {status} -> {output_path}")
+    save_build_cache(build_cache)
+    
+    counts = {}
+    for status, _, _, _ in results:
+        counts[status] = counts.get(status, 0) + 1
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Processed {len(jobs)} specs with {workers} worker(s) in {time.perf_counter() - started:.2f}s ({summary})")
+    return ok
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python generator.py <openapi_spec.yaml> [output.py]")
+    parser = argparse.ArgumentParser(description="Generate an MCP server from an OpenAPI spec.")
+    parser.add_argument("spec_path", help="OpenAPI spec (YAML or JSON), a directory of specs, or a glob such as 'examples/*.yaml'")
+    parser.add_argument("output_path", nargs="?", help="Output file (or package directory with --package) for a single spec (default: mcp_server_<api_name>.py)")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if the build cache says the output is up to date")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for multi-spec generation (default: CPU count)")
+    parser.add_argument("--output-dir", default=None, help="Directory for servers generated from multiple specs")
+    parser.add_argument("--spec-cache", default=spec_cache_dir, metavar="DIR", help="Cache parsed specs on disk in DIR (default: $MCP_SPEC_CACHE_DIR)")
+    parser.add_argument("--template-dir", default=None, metavar="DIR", help="Templates in DIR override the built-in ones of the same name")
+    parser.add_argument("--template-cache", default=template_cache_dir, metavar="DIR",
+                        help="Cache compiled template bytecode in DIR (default: $MCP_TEMPLATE_CACHE_DIR or a per-user temp dir)")
+    parser.add_argument("--fast-startup", action="store_true", help="Build models lazily and embed a precomputed OpenAPI document to cut import time")
+    parser.add_argument("--strict", action="store_true", help="Validate strictly by default, without type coercion")
+    parser.add_argument("--streaming", action="store_true", help="Parse only the spec sections the generator needs and stream output to disk, for very large specs")
+    parser.add_argument("--package", nargs="?", const="tag", choices=["tag", "alpha"], default=None,
+                        help="Write a package with models sharded by tag (default) or alphabetically, imported on first use")
+    parser.add_argument("--measure-import", action="store_true", help="Report how long each generated server takes to import")
+    args = parser.parse_args()
+    spec_cache_dir = args.spec_cache
+    template_cache_dir = args.template_cache
+    options = {'fast_startup': args.fast_startup, 'strict': args.strict, 'streaming': args.streaming, 'package': args.package}
+    if args.template_dir:
+        options['template_dir'] = os.path.abspath(args.template_dir)
+    
+    spec_paths = expand_spec_paths(args.spec_path)
+    if not spec_paths:
+        print(f"No specs found for {args.spec_path}")
         sys.exit(1)
     
-    spec_path = sys.argv[1]
-    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+    if len(spec_paths) == 1 and spec_paths[0] == args.spec_path:
+        output_paths = [generate_mcp_server(args.spec_path, args.output_path, force=args.force, options=options)]
+        ok = True
+    else:
+        if args.output_path:
+            parser.error("output_path is only supported for a single spec; use --output-dir")
+        ok = generate_many(spec_paths, args.output_dir, args.workers, args.force, options)
+        output_paths = [default_output_path(spec_path, args.output_dir, bool(args.package)) for spec_path in spec_paths]
     
-    generate_mcp_server(spec_path, output_path)
\ No newline at end of file
+    if args.measure_import:
+        for output_path in output_paths:
+            if os.path.exists(output_path):
+                timings = measure_import(output_path)
+                print(f"Imported {output_path} in {timings['module'] * 1000:.1f} ms "
+                      f"(plus {timings['dependencies'] * 1000:.1f} ms for fastapi, pydantic and httpx)")
+    sys.exit(0 if ok else 1)
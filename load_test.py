@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+import httpx
+
+import generator
+
+# --- Example Data ---
+def example_for(spec, schema, depth=0):
+    """Build an example value for a schema, preferring examples given in the spec."""
+    schema = generator.resolve_local_ref(spec, schema) if isinstance(schema, dict) else {}
+    if depth > 6:
+        return None
+    if 'example' in schema:
+        return schema['example']
+    if schema.get('examples'):
+        examples = schema['examples']
+        return examples[0] if isinstance(examples, list) else next(iter(examples.values()))
+    if schema.get('enum'):
+        return schema['enum'][0]
+    if 'default' in schema:
+        return schema['default']
+    for key in ('oneOf', 'anyOf'):
+        if schema.get(key):
+            return example_for(spec, schema[key][0], depth + 1)
+
+    schema_type = schema.get('type')
+    if isinstance(schema_type, list):
+        schema_type = next((t for t in schema_type if t != 'null'), None)
+    if 'properties' in schema or 'allOf' in schema or schema_type == 'object':
+        value = {}
+        for part in schema.get('allOf') or []:
+            part_value = example_for(spec, part, depth + 1)
+            if isinstance(part_value, dict):
+                value.update(part_value)
+        for name, prop in (schema.get('properties') or {}).items():
+            value[name] = example_for(spec, prop, depth + 1)
+        return value
+    if schema_type == 'array':
+        return [example_for(spec, schema.get('items', {}), depth + 1)]
+    if schema_type == 'integer':
+        return 1
+    if schema_type == 'number':
+        return 1.5
+    if schema_type == 'boolean':
+        return True
+    if schema.get('format') == 'date-time':
+        return "2024-01-01T00:00:00Z"
+    if schema.get('format') == 'date':
+        return "2024-01-01"
+    return "string"
+
+def response_example(spec, operation):
+    """Return (status, body) for the first successful response documented for an operation."""
+    responses = operation.get('responses') or {}
+    for status in sorted(responses, key=lambda code: (not str(code).startswith('2'), str(code))):
+        response = generator.resolve_local_ref(spec, responses[status])
+        for media_type, media in (response.get('content') or {}).items():
+            if 'json' not in media_type:
+                continue
+            if 'example' in media:
+                body = media['example']
+            elif media.get('examples'):
+                body = generator.resolve_local_ref(spec, next(iter(media['examples'].values()))).get('value')
+            else:
+                body = example_for(spec, media.get('schema', {}))
+            code = int(status) if str(status).isdigit() else 200
+            return code, body
+        return int(status) if str(status).isdigit() else 200, None
+    return 200, None
+
+# --- Mock Upstream ---
+class MockUpstream:
+    """httpx transport handler answering every spec operation with its documented example."""
+
+    def __init__(self, spec, latency=0.0):
+        self.latency = latency
+        self.routes = []
+        self.calls = 0
+        for path, path_item in (spec.get('paths') or {}).items():
+            path_item = generator.resolve_local_ref(spec, path_item)
+            pattern = re.compile('^' + re.sub(r'\\\{[^}]+\\\}', '[^/]+', re.escape(path)) + '$')
+            for method in generator.HTTP_METHODS:
+                if method in path_item:
+                    status, body = response_example(spec, path_item[method])
+                    content = json.dumps(body).encode() if body is not None else b''
+                    self.routes.append((method.upper(), pattern, status, content))
+
+    async def __call__(self, request):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for method, pattern, status, content in self.routes:
+            # Paths are matched by suffix since the base URL may carry a prefix
+            if request.method == method and any(pattern.match(request.url.path[i:]) for i in self._slashes(request.url.path)):
+                # A stream, not content: the server reads streamed tool responses with aiter_raw()
+                return httpx.Response(status, stream=httpx.ByteStream(content), headers={"content-type": "application/json"})
+        return httpx.Response(404, json={"detail": "No mock for this operation"})
+
+    @staticmethod
+    def _slashes(path):
+        return [i for i, char in enumerate(path) if char == '/']
+
+# --- Scenario ---
+def build_requests(spec_path, module, batch_size):
+    """Build the (name, method, path, json) requests covering every endpoint of the server."""
+    spec = generator.load_spec(spec_path)
+    parsed = generator.parse_openapi_spec(spec_path)
+    resolver = generator.SchemaResolver(spec)
+    schemas = resolver.schemas
+    class_to_schema = {class_name: name for name, class_name in resolver.class_names.items()}
+
+    requests = [
+        ("GET /health", "GET", "/health", None),
+        ("GET /context", "GET", "/context", None),
+        ("POST /config", "POST", "/config", {"api_key": "load-test-key"}),
+    ]
+    for class_name, schema_name in class_to_schema.items():
+        if class_name not in module.models_dict:
+            continue
+        data = example_for(spec, schemas[schema_name])
+        requests.append((f"POST /validate {class_name}", "POST", "/validate", {"model_name": class_name, "data": data}))
+        requests.append((f"POST /validate/batch {class_name}", "POST", "/validate/batch",
+                         {"model_name": class_name, "data": [data] * batch_size}))
+
+    for operation in parsed['operations']:
+        arguments = {}
+        for param in operation['params']:
+            if 'default' in param:
+                arguments[param['name']] = param['default']
+            elif param.get('enum'):
+                arguments[param['name']] = param['enum'][0]
+            else:
+                arguments[param['name']] = example_for(spec, {'type': param['type']})
+        if operation['body']:
+            schema_name = class_to_schema.get(operation['body']['model'])
+            arguments['body'] = example_for(spec, schemas[schema_name]) if schema_name else {}
+        requests.append((f"POST /tools/{operation['operation_id']}", "POST", f"/tools/{operation['operation_id']}", arguments))
+        # The streamed relay is a separate path through the server; cover it too
+        requests.append((f"POST /tools/{operation['operation_id']} stream", "POST",
+                         f"/tools/{operation['operation_id']}?stream=true", arguments))
+    return requests
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def run_load(module, requests, concurrency, total, duration):
+    """Send requests round-robin from `concurrency` workers; return per-endpoint samples."""
+    samples = {name: {"latencies": [], "errors": 0, "statuses": {}} for name, _, _, _ in requests}
+    sequence = itertools.count()
+    deadline = time.perf_counter() + duration if duration else None
+
+    async with module.app.router.lifespan_context(module.app):
+        transport = httpx.ASGITransport(app=module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://mcp.local") as client:
+            async def worker():
+                while True:
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        return
+                    index = next(sequence)
+                    if total and index >= total:
+                        return
+                    name, method, path, body = requests[index % len(requests)]
+                    sample = samples[name]
+                    started = time.perf_counter()
+                    try:
+                        response = await client.request(method, path, json=body)
+                        status = response.status_code
+                    except Exception as e:
+                        status = type(e).__name__
+                    sample["latencies"].append(time.perf_counter() - started)
+                    sample["statuses"][str(status)] = sample["statuses"].get(str(status), 0) + 1
+                    if not isinstance(status, int) or status >= 400:
+                        sample["errors"] += 1
+                    # ASGITransport can complete a request without suspending;
+                    # yield so every worker gets a turn and --concurrency holds
+                    await asyncio.sleep(0)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+async def check_upstream_validation(module, requests):
+    """Check that ?validate=true turns a non-JSON upstream body into a 502, not a 500.
+
+    Returns the failures; the normal upstream and the response cache are left as they were.
+    """
+    failures = []
+    transport, module.api_client.transport = module.api_client.transport, httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b"<html>not json</html>", headers={"content-type": "text/html"}))
+    cache_enabled = getattr(module, 'response_cache', None) and module.response_cache.enabled
+    if cache_enabled:
+        module.response_cache.enabled = False
+    try:
+        async with module.app.router.lifespan_context(module.app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=module.app, raise_app_exceptions=False),
+                                         base_url="http://mcp.local") as client:
+                for name, method, path, body in requests:
+                    operation = module.OPERATIONS.get(path.rpartition('/')[2]) if path.startswith("/tools/") else None
+                    if not operation or operation["response_model"] not in module.models_dict or "?" in path:
+                        continue
+                    response = await client.request(method, f"{path}?validate=true", json=body)
+                    if response.status_code != 502 or "errors" not in response.json().get("detail", {}):
+                        failures.append(f"{name}?validate=true on a non-JSON body: {response.status_code} {response.text[:200]}")
+    finally:
+        module.api_client.transport = transport
+        if cache_enabled:
+            module.response_cache.enabled = True
+    return failures
+
+def summarize(samples, elapsed):
+    endpoints = {}
+    all_latencies = []
+    total_errors = 0
+    for name, sample in samples.items():
+        latencies = sorted(sample["latencies"])
+        all_latencies.extend(latencies)
+        total_errors += sample["errors"]
+        endpoints[name] = {
+            "requests": len(latencies),
+            "errors": sample["errors"],
+            "error_rate": sample["errors"] / len(latencies) if latencies else 0.0,
+            "statuses": sample["statuses"],
+            "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+        }
+    all_latencies.sort()
+    return {
+        "elapsed_seconds": elapsed,
+        "requests": len(all_latencies),
+        "errors": total_errors,
+        "error_rate": total_errors / len(all_latencies) if all_latencies else 0.0,
+        "throughput_rps": len(all_latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(all_latencies, 0.50) * 1000,
+        "p95_ms": percentile(all_latencies, 0.95) * 1000,
+        "p99_ms": percentile(all_latencies, 0.99) * 1000,
+        "endpoints": endpoints,
+    }
+
+def print_report(report):
+    width = max([len(name) for name in report["endpoints"]] + [5])
+    print(f"{'endpoint':<{width}}  {'reqs':>7}  {'rps':>9}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'errors':>7}")
+    rows = list(report["endpoints"].items()) + [("total", report)]
+    for name, stats in rows:
+        print(f"{name:<{width}}  {stats['requests']:>7}  {stats['throughput_rps']:>9.1f}  {stats['p50_ms']:>8.2f}  "
+              f"{stats['p95_ms']:>8.2f}  {stats['p99_ms']:>8.2f}  {stats['error_rate']:>6.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a generated MCP server in-process against a mock upstream.")
+    parser.add_argument("spec_path", help="OpenAPI spec the server was generated from; its response examples drive the mock upstream")
+    parser.add_argument("--server", default=None, help="Generated server module (default: generate one from the spec into a temp dir)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent in-flight requests")
+    parser.add_argument("--requests", type=int, default=5000, help="Total requests to send (ignored when --duration is set)")
+    parser.add_argument("--duration", type=float, default=None, help="Run for this many seconds instead of a fixed request count")
+    parser.add_argument("--upstream-latency", type=float, default=0.0, help="Simulated upstream latency in milliseconds")
+    parser.add_argument("--batch-size", type=int, default=100, help="Records per /validate/batch request")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the server's response cache")
+    parser.add_argument("--no-rate-limit", action="store_true", help="Disable the server's upstream rate and concurrency limits")
+    parser.add_argument("--json", default=None, metavar="PATH", help="Also write the report as JSON")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="Exit non-zero if the overall error rate exceeds this fraction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        server_path = args.server
+        if not server_path:
+            server_path = os.path.join(workdir, "mcp_server_under_test.py")
+            generator.build_server(args.spec_path, server_path, force=True)
+        module = generator.load_server_module("mcp_server_under_test", server_path)
+
+    upstream = MockUpstream(generator.load_spec(args.spec_path), latency=args.upstream_latency / 1000)
+    module.api_client.transport = httpx.MockTransport(upstream)
+    if args.no_cache and hasattr(module, 'response_cache'):
+        module.response_cache.enabled = False
+    if args.no_rate_limit and hasattr(module, 'upstream_limiter'):
+        module.upstream_limiter.rate = 0.0
+        module.upstream_limiter.semaphore = None
+
+    requests = build_requests(args.spec_path, module, args.batch_size)
+    failures = asyncio.run(check_upstream_validation(module, requests))
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    samples, elapsed = asyncio.run(run_load(module, requests, args.concurrency, None if args.duration else args.requests, args.duration))
+    report = summarize(samples, elapsed)
+    report["upstream_calls"] = upstream.calls
+    report["config"] = {k: v for k, v in vars(args).items() if k != "json"}
+
+    print_report(report)
+    print(f"\n{report['requests']} requests in {elapsed:.2f}s, {upstream.calls} upstream calls")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+
+    if failures or (args.max_error_rate is not None and report["error_rate"] > args.max_error_rate):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
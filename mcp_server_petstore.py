@@ -1,19 +1,50 @@
-from fastapi import FastAPI, HTTPException, Depends, Header, Query
-from pydantic import BaseModel, ValidationError
-from typing import Dict, List, Any, Optional
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Body, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from pydantic import BaseModel, RootModel, ConfigDict, Field, ValidationError, TypeAdapter
+from typing import Dict, List, Any, Literal, Optional, Union
+from collections import OrderedDict, namedtuple
+from contextlib import AsyncExitStack, asynccontextmanager
+import asyncio
+import bisect
+import gzip
+import hashlib
 import json
 import httpx
+import math
 import os
+import random
+import time
 import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote
 
-app = FastAPI(
-    title="Model Context Protocol Server for Swagger Petstore",
-    description="MCP server generated from OpenAPI spec for Swagger Petstore",
-    version="1.0.0"
-)
+try:
+    import h2  # noqa: F401  (enables HTTP/2 support in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- JSON Encoding ---
+def dumps_json(content):
+    """Serialize to compact UTF-8 JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """Default response class; endpoints on hot paths return it directly to skip jsonable_encoder."""
+    
+    def render(self, content):
+        return dumps_json(content)
 
 # --- Generated Models ---
 
+
 class Pet(BaseModel):
     
     id: Optional[int] = None
@@ -24,25 +55,35 @@ class Pet(BaseModel):
     
     
     
-    status: Optional[str] = None
+    status: Optional[Literal['available', 'pending', 'sold']] = None
+    
     
-      # Allowed values: ['available', 'pending', 'sold']
     
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        populate_by_name=True,
+        
+        
+        json_schema_extra={
             "example": {
                 
-                "id": 0
+                'id': 0
                                   ,
                 
-                "name": "sample_name",
+                'name': "sample_name",
                 
-                "status": "available"
+                'status': 'available'
                                   
                 
             }
-        }
+        },
+    )
+
+
+
+
+# Resolve forward references of recursive models
+
 
 
 # Create a dictionary of model classes for validation
@@ -56,74 +97,537 @@ models_dict = {
 class APIConfig:
     def __init__(self):
         self.api_key = os.environ.get("API_KEY", "")
-        self.base_url = os.environ.get("API_BASE_URL", "https://petstore.swagger.io/v2")
+        self.base_url = os.environ.get("API_BASE_URL", 'https://petstore.swagger.io/v2')
     
     def update(self, api_key=None, base_url=None):
-        if api_key:
+        """Apply new settings and report whether anything actually changed."""
+        changed = False
+        if api_key and api_key != self.api_key:
             self.api_key = api_key
-        if base_url:
+            changed = True
+        if base_url and base_url != self.base_url:
             self.base_url = base_url
+            changed = True
+        return changed
 
 api_config = APIConfig()
 
-# --- API Client ---
-async def get_api_client():
-    headers = {}
+# --- Shared Config ---
+class SharedConfigFile:
+    """Propagates /config updates between worker processes through a JSON file.
+    
+    Writers replace the file atomically; every process polls its mtime and
+    applies what it finds.
+    """
+    
+    def __init__(self, path, poll_interval):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._signature = None
+    
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino, stat.st_uid
+    
+    def write(self, config):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        # The file holds the API key, so only the owner may read it
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(json.dumps({"api_key": config.api_key, "base_url": config.base_url}).encode("utf-8"))
+        os.replace(tmp_path, self.path)
+    
+    def read_if_changed(self):
+        """Return the file's settings if it changed since the last call, else None."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+        self._signature = signature
+        if hasattr(os, "geteuid") and signature[3] != os.geteuid():
+            # Another user could point base_url at their own host and collect the API key
+            print(f"Ignoring config file {self.path}: not owned by this user")
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                values = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        return values if isinstance(values, dict) else None
+
+config_file = SharedConfigFile(os.environ.get("MCP_CONFIG_FILE"), float(os.environ.get("MCP_CONFIG_POLL_INTERVAL", "0.5")))
+
+# --- Upstream Connection Pool ---
+def _env_flag(name, default="false"):
+    return os.environ.get(name, default).lower() in ("1", "true", "yes", "on")
+
+class ClientSettings:
+    def __init__(self):
+        self.max_connections = int(os.environ.get("MCP_MAX_CONNECTIONS", "100"))
+        self.max_keepalive_connections = int(os.environ.get("MCP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+        self.keepalive_expiry = float(os.environ.get("MCP_KEEPALIVE_EXPIRY", "30"))
+        self.connect_timeout = float(os.environ.get("MCP_CONNECT_TIMEOUT", "5"))
+        self.read_timeout = float(os.environ.get("MCP_READ_TIMEOUT", "30"))
+        self.write_timeout = float(os.environ.get("MCP_WRITE_TIMEOUT", "30"))
+        self.pool_timeout = float(os.environ.get("MCP_POOL_TIMEOUT", "5"))
+        self.http2 = _env_flag("MCP_HTTP2") and HTTP2_AVAILABLE
+    
+    def limits(self):
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
     
-    # Add security headers
+    def timeout(self):
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+def get_auth_settings():
+    """Return the (headers, query params) carrying the configured credentials."""
+    headers = {}
+    params = {}
     
     
     if api_config.api_key:
-        headers["api_key"] = api_config.api_key
+        headers['api_key'] = api_config.api_key
+    
+    
+    return headers, params
+
+class APIClient:
+    """Owns the long-lived pooled httpx client used for all upstream calls."""
+    
+    def __init__(self, settings):
+        self.settings = settings
+        # Optional transport override (e.g. a mock upstream or a shared pool).
+        self.transport = None
+        self._client = None
+        self._lock = asyncio.Lock()
+        self._retired = {}
+    
+    def _build(self):
+        headers, params = get_auth_settings()
+        return httpx.AsyncClient(
+            base_url=api_config.base_url,
+            headers=headers,
+            params=params,
+            limits=self.settings.limits(),
+            timeout=self.settings.timeout(),
+            http2=self.settings.http2,
+            transport=self.transport,
+        )
+    
+    @property
+    def client(self):
+        if self._client is None:
+            # Lazily created when the app is used without running its lifespan.
+            self._client = self._build()
+        return self._client
+    
+    def pool_stats(self):
+        """Count pooled connections; relies on httpcore internals, so degrade to zeros."""
+        stats = {"active": 0, "idle": 0}
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        for connection in getattr(pool, "connections", []):
+            try:
+                stats["idle" if connection.is_idle() else "active"] += 1
+            except Exception:
+                pass
+        return stats
+    
+    async def start(self):
+        async with self._lock:
+            if self._client is None:
+                self._client = self._build()
+    
+    async def rebuild(self):
+        """Swap in a client built from the current config.
+        
+        The old client keeps serving requests already in flight and is closed
+        once the read timeout has elapsed.
+        """
+        async with self._lock:
+            old_client, self._client = self._client, self._build()
+        if old_client is not None:
+            self._retired[old_client] = asyncio.create_task(self._close_later(old_client))
+    
+    async def _close_later(self, client):
+        await asyncio.sleep(self.settings.read_timeout)
+        self._retired.pop(client, None)
+        await self._close_client(client)
+    
+    async def _close_client(self, client):
+        # A transport supplied from outside is owned by its creator.
+        if self.transport is None:
+            await client.aclose()
+    
+    async def close(self):
+        retired, self._retired = self._retired, {}
+        for client, task in retired.items():
+            task.cancel()
+            await self._close_client(client)
+        async with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await self._close_client(client)
+
+api_client = APIClient(ClientSettings())
+
+# --- Metrics ---
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _labels(**labels):
+    escaped = (f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), chr(92) + "n")}"' for name, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+class Metrics:
+    """In-process counters and histograms rendered in Prometheus text format."""
+    
+    def __init__(self):
+        self.requests = {}  # (method, route, status) -> count
+        self.request_latency = {}  # (method, route) -> Histogram
+        self.in_flight = 0
+        self.upstream_requests = {}  # (operation, status) -> count
+        self.upstream_latency = {}  # operation -> Histogram
+        self.upstream_in_flight = 0
+        self.validation_failures = {}  # model -> count
+        self.upstream_retries = {}  # operation -> count
+        self.upstream_rejected = {}  # reason -> count
+        self.upstream_queue_wait = Histogram()
     
+    def observe_request(self, method, route, status, seconds):
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.request_latency.get((method, route))
+        if histogram is None:
+            histogram = self.request_latency[(method, route)] = Histogram()
+        histogram.observe(seconds)
     
+    def observe_upstream(self, operation_id, status, seconds):
+        key = (operation_id, status)
+        self.upstream_requests[key] = self.upstream_requests.get(key, 0) + 1
+        histogram = self.upstream_latency.get(operation_id)
+        if histogram is None:
+            histogram = self.upstream_latency[operation_id] = Histogram()
+        histogram.observe(seconds)
     
+    def count_retry(self, operation_id):
+        self.upstream_retries[operation_id] = self.upstream_retries.get(operation_id, 0) + 1
     
-    async with httpx.AsyncClient(base_url=api_config.base_url, headers=headers) as client:
-        yield client
+    def count_rejected(self, reason):
+        self.upstream_rejected[reason] = self.upstream_rejected.get(reason, 0) + 1
+    
+    def count_validation_failures(self, model_name, count=1):
+        if count:
+            self.validation_failures[model_name] = self.validation_failures.get(model_name, 0) + count
+    
+    def render(self):
+        lines = []
+        
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        
+        def histogram_samples(name, histograms):
+            samples = []
+            for labels, histogram in histograms:
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    samples.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+                samples.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+                samples.append(f"{name}_sum{_labels(**labels)} {histogram.sum}")
+                samples.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+            return samples
+        
+        metric("mcp_http_requests_total", "counter", "HTTP requests handled, by route and status.",
+               [f"mcp_http_requests_total{_labels(method=m, route=r, status=s)} {n}" for (m, r, s), n in self.requests.items()])
+        metric("mcp_http_request_duration_seconds", "histogram", "HTTP request latency by route.",
+               histogram_samples("mcp_http_request_duration_seconds",
+                                 [({"method": m, "route": r}, h) for (m, r), h in self.request_latency.items()]))
+        metric("mcp_http_requests_in_flight", "gauge", "HTTP requests currently being handled.",
+               [f"mcp_http_requests_in_flight {self.in_flight}"])
+        metric("mcp_upstream_requests_total", "counter", "Upstream calls by operation and status code.",
+               [f"mcp_upstream_requests_total{_labels(operation=o, status=s)} {n}" for (o, s), n in self.upstream_requests.items()])
+        metric("mcp_upstream_request_duration_seconds", "histogram", "Upstream call latency by operation.",
+               histogram_samples("mcp_upstream_request_duration_seconds",
+                                 [({"operation": o}, h) for o, h in self.upstream_latency.items()]))
+        metric("mcp_upstream_requests_in_flight", "gauge", "Upstream calls currently in flight.",
+               [f"mcp_upstream_requests_in_flight {self.upstream_in_flight}"])
+        metric("mcp_upstream_retries_total", "counter", "Upstream calls retried, by operation.",
+               [f"mcp_upstream_retries_total{_labels(operation=o)} {n}" for o, n in self.upstream_retries.items()])
+        metric("mcp_upstream_rejected_total", "counter", "Calls rejected by the upstream limiter, by reason.",
+               [f"mcp_upstream_rejected_total{_labels(reason=r)} {n}" for r, n in self.upstream_rejected.items()])
+        metric("mcp_upstream_queue_wait_seconds", "histogram", "Time calls waited for the upstream limiter.",
+               histogram_samples("mcp_upstream_queue_wait_seconds", [({}, self.upstream_queue_wait)]))
+        metric("mcp_validation_failures_total", "counter", "Records that failed validation, by model.",
+               [f"mcp_validation_failures_total{_labels(model=m)} {n}" for m, n in self.validation_failures.items()])
+        
+        pool = api_client.pool_stats()
+        metric("mcp_upstream_pool_connections", "gauge", "Upstream connections in the pool by state.",
+               [f"mcp_upstream_pool_connections{_labels(state=state)} {pool[state]}" for state in ("active", "idle")])
+        metric("mcp_upstream_pool_max_connections", "gauge", "Configured upstream connection limit.",
+               [f"mcp_upstream_pool_max_connections {api_client.settings.max_connections}"])
+        
+        cache = response_cache.stats()
+        for name in ("hits", "misses", "coalesced", "evictions"):
+            metric(f"mcp_cache_{name}_total", "counter", f"Response cache {name}.", [f"mcp_cache_{name}_total {cache[name]}"])
+        metric("mcp_cache_entries", "gauge", "Responses currently cached.", [f"mcp_cache_entries {cache['entries']}"])
+        metric("mcp_cache_bytes", "gauge", "Bytes of cached response bodies.", [f"mcp_cache_bytes {cache['bytes']}"])
+        
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+def route_label(scope):
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Label dispatched tool calls per operation, but only for known ones
+    operation_id = scope.get("path_params", {}).get("operation_id")
+    if operation_id in OPERATIONS:
+        return f"/tools/{operation_id}"
+    return route.path
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request by matched route."""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = 500
+        
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe_request(scope["method"], route_label(scope), status, time.perf_counter() - started)
+
+# --- API Client ---
+# Async so FastAPI resolves it on the event loop instead of a worker thread
+async def get_api_client() -> httpx.AsyncClient:
+    return api_client.client
+
+async def apply_config(api_key=None, base_url=None):
+    """Apply new upstream settings, rebuilding the client and cache if they changed."""
+    if not api_config.update(api_key=api_key, base_url=base_url):
+        return False
+    await api_client.rebuild()
+    response_cache.clear()
+    return True
+
+async def watch_config_file():
+    while True:
+        await asyncio.sleep(config_file.poll_interval)
+        values = config_file.read_if_changed()
+        if values:
+            await apply_config(values.get("api_key"), values.get("base_url"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    watcher = None
+    if config_file.path:
+        values = config_file.read_if_changed()
+        if values:
+            api_config.update(api_key=values.get("api_key"), base_url=values.get("base_url"))
+        watcher = asyncio.create_task(watch_config_file())
+    await api_client.start()
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    await api_client.close()
+
+app = FastAPI(
+    title='Model Context Protocol Server for Swagger Petstore',
+    description='MCP server generated from OpenAPI spec for Swagger Petstore',
+    version='1.0.0',
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
+)
+if _env_flag("MCP_METRICS_ENABLED", "true"):
+    app.add_middleware(MetricsMiddleware)
 
 # --- MCP Endpoints ---
-@app.get("/context")
-async def list_models():
-    return {
-        "models": {
-            
-            "Pet": {
-                "fields": {
+# --- Context Document ---
+# The document never changes while the server runs, so it is serialized
+# (and compressed) once, on first request, and served as raw bytes.
+CONTEXT = {
+    "models": {
+        
+        "Pet": {
+            "fields": {
+                
+                'id': {
+                    "type": 'integer',
+                    "required": False,
+                    
+                    
+                    "description": ''
+                },
+                
+                'name': {
+                    "type": 'string',
+                    "required": False,
+                    
                     
-                    "id": {
-                        "type": "integer",
-                        "required": False,
-                        
-                        "description": ""
-                    },
+                    "description": ''
+                },
+                
+                'status': {
+                    "type": 'string',
+                    "required": False,
                     
-                    "name": {
-                        "type": "string",
-                        "required": False,
-                        
-                        "description": ""
-                    },
+                    "enum": ['available', 'pending', 'sold'],
                     
-                    "status": {
-                        "type": "string",
-                        "required": False,
-                        
-                        "enum": ["available", "pending", "sold"],
-                        
-                        "description": ""
-                    }
                     
+                    "description": ''
                 }
+                
             }
-            
         }
+        
+    },
+    "operations": {
+        
+        'post_pet': {
+            "method": 'POST',
+            "path": '/pet',
+            "summary": 'Add a new pet',
+            "description": '',
+            "parameters": {
+                
+            },
+            "body": {"required": False, "model": 'Pet'},
+            "response_model": 'Pet'
+        },
+        
     }
+}
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CONTEXT_MAX_AGE = int(os.environ.get("MCP_CONTEXT_MAX_AGE", "300"))
+
+class StaticPayload:
+    """Pre-serialized JSON document with strong ETags and compressed variants."""
+    
+    def __init__(self, document, compress=True):
+        self.document = document
+        self.compress = compress
+        self._variants = None
+    
+    @property
+    def variants(self):
+        # Built lazily so serializing large documents stays off the import path
+        if self._variants is None:
+            body = dumps_json(self.document)
+            digest = hashlib.sha256(body).hexdigest()[:32]
+            # encoding -> (body, etag); each representation gets its own strong ETag
+            variants = {"identity": (body, f'"{digest}"')}
+            if self.compress:
+                if brotli is not None:
+                    variants["br"] = (brotli.compress(body), f'"{digest}-br"')
+                variants["gzip"] = (gzip.compress(body, compresslevel=6), f'"{digest}-gzip"')
+            self._variants = variants
+        return self._variants
+    
+    def select_encoding(self, accept_encoding):
+        accepted = set()
+        for token in accept_encoding.split(","):
+            coding, _, params = token.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(coding.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+    
+    def response(self, request):
+        encoding = self.select_encoding(request.headers.get("accept-encoding", ""))
+        body, etag = self.variants[encoding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={CONTEXT_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if etag in tags or "*" in tags:
+                return Response(status_code=304, headers=headers)
+        
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+context_payload = StaticPayload(CONTEXT, compress=_env_flag("MCP_CONTEXT_COMPRESSION", "true"))
+
+@app.get("/context")
+async def list_models(request: Request):
+    return context_payload.response(request)
+
+# --- Validation ---
+# Strict mode rejects type coercion (e.g. "1" for an integer). The generator's
+# --strict flag sets the default; requests may override it with "strict".
+STRICT_VALIDATION = _env_flag("MCP_STRICT_VALIDATION", 'false')
+
+def validate_with(adapter, data, strict):
+    if strict:
+        # Strict checks run on JSON input so that values JSON can only carry
+        # as strings, such as date-times, are still accepted
+        return adapter.validate_json(dumps_json(data), strict=True)
+    return adapter.validate_python(data, strict=False)
+
+def strict_option(value):
+    if value is None:
+        return STRICT_VALIDATION
+    if not isinstance(value, bool):
+        raise HTTPException(status_code=400, detail="strict must be a boolean")
+    return value
 
 @app.post("/validate")
 async def validate_model(request: Dict[str, Any]):
     model_name = request.get("model_name")
     data = request.get("data", {})
+    strict = strict_option(request.get("strict"))
     
     if not model_name:
         raise HTTPException(status_code=400, detail="model_name is required")
@@ -131,29 +635,661 @@ async def validate_model(request: Dict[str, Any]):
     if model_name not in models_dict:
         raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
     
-    # Validate the data against the model
+    # Validate the data and serialize the model straight to JSON bytes
+    adapter = get_adapter(model_name)
     try:
-        model_class = models_dict[model_name]
-        validated_data = model_class(**data)
-        return {"valid": True, "data": validated_data.dict()}
+        validated_data = validate_with(adapter, data, strict)
     except ValidationError as e:
-        return {"valid": False, "errors": e.errors()}
+        metrics.count_validation_failures(model_name)
+        body = b'{"valid":false,"errors":' + e.json().encode("utf-8") + b'}'
+    else:
+        body = b'{"valid":true,"data":' + adapter.dump_json(validated_data, by_alias=True) + b'}'
+    return Response(content=body, media_type="application/json")
+
+# --- Batch Validation ---
+VALIDATE_CHUNK_SIZE = int(os.environ.get("MCP_VALIDATE_CHUNK_SIZE", "1000"))
+
+# Adapters are built once per model and reused for every request
+adapters = {}
+list_adapters = {}
+
+def get_adapter(model_name):
+    adapter = adapters.get(model_name)
+    if adapter is None:
+        adapter = adapters[model_name] = TypeAdapter(models_dict[model_name])
+    return adapter
+
+def get_list_adapter(model_name):
+    adapter = list_adapters.get(model_name)
+    if adapter is None:
+        adapter = list_adapters[model_name] = TypeAdapter(List[models_dict[model_name]])
+    return adapter
+
+def validate_records(model_name, records, strict=False):
+    """Validate many records of one model in a single pydantic call."""
+    adapter = get_list_adapter(model_name)
+    try:
+        validated = validate_with(adapter, records, strict)
+        return [{"valid": True, "data": data} for data in adapter.dump_python(validated, mode="json", by_alias=True)]
+    except ValidationError as e:
+        errors_by_index = {}
+        for error in e.errors():
+            index, loc = error["loc"][0], error["loc"][1:]
+            errors_by_index.setdefault(index, []).append({**error, "loc": loc})
+        metrics.count_validation_failures(model_name, len(errors_by_index))
+    
+    results = [{"valid": False, "errors": errors_by_index[i]} if i in errors_by_index else None for i in range(len(records))]
+    valid_indexes = [i for i, result in enumerate(results) if result is None]
+    if valid_indexes:
+        validated = validate_with(adapter, [records[i] for i in valid_indexes], strict)
+        for i, data in zip(valid_indexes, adapter.dump_python(validated, mode="json", by_alias=True)):
+            results[i] = {"valid": True, "data": data}
+    return results
+
+def validate_items(items, strict=False):
+    """Validate (model_name, data) pairs, grouping them per model."""
+    results = [None] * len(items)
+    groups = {}
+    for i, (model_name, data) in enumerate(items):
+        if not model_name:
+            results[i] = {"valid": False, "error": "model_name is required"}
+        elif model_name not in models_dict:
+            results[i] = {"valid": False, "error": f"Model {model_name} not found"}
+        else:
+            groups.setdefault(model_name, []).append(i)
+    
+    for model_name, indexes in groups.items():
+        group_results = validate_records(model_name, [items[i][1] for i in indexes], strict)
+        for i, result in zip(indexes, group_results):
+            results[i] = result
+    return results
+
+def parse_batch_request(request):
+    """Accept either {model_name, data: [...]} or {items: [{model_name, data}, ...]}."""
+    if "items" in request:
+        items = request["items"]
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="items must be a list")
+        return [(item.get("model_name"), item.get("data", {})) if isinstance(item, dict) else (None, item) for item in items]
+    
+    model_name = request.get("model_name")
+    data = request.get("data")
+    if not model_name:
+        raise HTTPException(status_code=400, detail="model_name or items is required")
+    if model_name not in models_dict:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="data must be a list")
+    return [(model_name, record) for record in data]
+
+@app.post("/validate/batch")
+async def validate_batch(request: Dict[str, Any]):
+    results = validate_items(parse_batch_request(request), strict_option(request.get("strict")))
+    valid_count = sum(1 for result in results if result["valid"])
+    return FastJSONResponse({
+        "results": results,
+        "valid_count": valid_count,
+        "invalid_count": len(results) - valid_count
+    })
+
+async def iter_ndjson_items(request, model_name):
+    """Yield (model_name, data) pairs from an NDJSON request body as it arrives.
+    
+    Lines that are not valid JSON are yielded as ready-made error results.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield parse_ndjson_line(line, model_name)
+    if buffer.strip():
+        yield parse_ndjson_line(buffer, model_name)
+
+def parse_ndjson_line(line, model_name):
+    try:
+        record = orjson.loads(line) if orjson is not None else json.loads(line)
+    except ValueError as e:
+        return {"valid": False, "error": f"Invalid JSON: {e}"}
+    if model_name:
+        return (model_name, record)
+    if not isinstance(record, dict):
+        return (None, record)
+    return (record.get("model_name"), record.get("data", {}))
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves `receive` to the body iterator.
+    
+    The default implementation listens for disconnects on `receive`, which
+    would swallow the request body we are still reading.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+@app.post("/validate/batch/stream")
+async def validate_batch_stream(request: Request, model_name: Optional[str] = Query(default=None),
+                                strict: Optional[bool] = Query(default=None)):
+    """Validate an NDJSON stream, one result line per input line.
+    
+    Each line is either {"model_name": ..., "data": ...} or, when the model_name
+    query parameter is given, a bare data object.
+    """
+    if model_name and model_name not in models_dict:
+        raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+    strict = strict_option(strict)
+    
+    async def generate():
+        chunk = []
+        async for item in iter_ndjson_items(request, model_name):
+            if isinstance(item, dict):
+                if chunk:
+                    yield encode_ndjson(validate_items(chunk, strict))
+                    chunk = []
+                yield encode_ndjson([item])
+                continue
+            chunk.append(item)
+            if len(chunk) >= VALIDATE_CHUNK_SIZE:
+                yield encode_ndjson(validate_items(chunk, strict))
+                chunk = []
+        if chunk:
+            yield encode_ndjson(validate_items(chunk, strict))
+    
+    return DuplexStreamingResponse(generate(), media_type="application/x-ndjson")
+
+def encode_ndjson(results):
+    return b"".join(dumps_json(result) + b"\n" for result in results)
 
 @app.post("/config")
 async def update_config(config: Dict[str, str]):
     api_key = config.get("api_key")
     base_url = config.get("base_url")
     
-    api_config.update(api_key=api_key, base_url=base_url)
+    if config_file.path:
+        # Catch up with siblings first, so a field left out here keeps its latest value
+        values = config_file.read_if_changed()
+        if values:
+            await apply_config(values.get("api_key"), values.get("base_url"))
+    await apply_config(api_key=api_key, base_url=base_url)
+    if config_file.path:
+        # Written even when nothing changed locally; otherwise a sibling's
+        # older update would replace this one on the next poll
+        config_file.write(api_config)
     
     return {"message": "Configuration updated successfully"}
 
+# --- Upstream Operations ---
+# Parameter locations are resolved at generation time, so building an
+# upstream request is a dictionary lookup per argument.
+OPERATIONS = {
+    
+    'post_pet': {
+        "method": 'POST',
+        "path": '/pet',
+        "params": {
+            
+        },
+        "required": [],
+        "body": True,
+        "body_required": False,
+        "cache_ttl": 0.0,
+        "idempotent": False,
+        "stream": False,
+        "response_model": 'Pet',
+    },
+    
+}
+
+def build_upstream_request(operation, arguments):
+    """Split tool arguments into path, query, header and cookie parameters plus the body."""
+    targets = {"path": {}, "query": {}, "header": {}, "cookie": {}}
+    locations = operation["params"]
+    
+    missing = [name for name in operation["required"] if arguments.get(name) is None]
+    if operation["body_required"] and arguments.get("body") is None:
+        missing.append("body")
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing required arguments: {', '.join(missing)}")
+    
+    body = None
+    for name, value in arguments.items():
+        if value is None:
+            continue
+        location = locations.get(name)
+        if location is not None:
+            targets[location][name] = value
+        elif name == "body" and operation["body"]:
+            body = value
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown argument {name}")
+    
+    path = operation["path"]
+    if targets["path"]:
+        path = path.format_map({name: quote(str(value), safe="") for name, value in targets["path"].items()})
+    headers = {name: str(value) for name, value in targets["header"].items()}
+    
+    return {
+        "method": operation["method"],
+        "url": path,
+        "params": targets["query"] or None,
+        "headers": headers or None,
+        "cookies": targets["cookie"] or None,
+        "json": body,
+    }
+
+UpstreamResult = namedtuple("UpstreamResult", ["status_code", "content", "media_type"])
+
+# --- Response Cache ---
+class ResponseCache:
+    """In-process LRU cache of upstream responses with a TTL per entry.
+    
+    Concurrent misses for the same key share a single upstream call.
+    """
+    
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = max_entries > 0 and max_bytes > 0
+        self._entries = OrderedDict()  # key -> (expires_at, UpstreamResult)
+        self._inflight = {}  # key -> asyncio.Future
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(operation_id, arguments):
+        normalized = {name: value for name, value in arguments.items() if value is not None}
+        return operation_id + ":" + json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return result
+    
+    def _store(self, key, result, ttl):
+        if key in self._entries:
+            self._remove(key)
+        size = len(result.content)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._size += size
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def _remove(self, key):
+        _, result = self._entries.pop(key)
+        self._size -= len(result.content)
+    
+    async def get_or_fetch(self, key, ttl, fetch):
+        result = self._lookup(key)
+        if result is not None:
+            self.hits += 1
+            return result
+        
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The request that owned the upstream call went away
+                return await fetch()
+        
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        
+        if 200 <= result.status_code < 300:
+            self._store(key, result, ttl)
+        future.set_result(result)
+        return result
+    
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+    
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("MCP_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.environ.get("MCP_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+)
+
+# --- Upstream Limiter ---
+class UpstreamLimiter:
+    """Token bucket plus concurrency cap shared by every call to the upstream API.
+    
+    The bucket is a GCRA: each call reserves the next free send time, so
+    waiters are served in arrival order without a lock. Calls that would
+    wait longer than max_wait are rejected instead of queued.
+    """
+    
+    def __init__(self, rate, burst, max_concurrency, max_wait):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_wait = max_wait
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self.max_concurrency = max_concurrency
+        self.next_send = 0.0  # theoretical arrival time of the next call
+        self.paused_until = 0.0
+        self.waiting = 0
+    
+    def pause(self, seconds):
+        """Hold every call for `seconds`, e.g. after an upstream Retry-After."""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        if self.rate > 0:
+            # Resume at the configured rate rather than with a burst
+            self.next_send = max(self.next_send, self.paused_until + (self.burst - 1) / self.rate)
+    
+    def _reserve(self, deadline):
+        now = time.monotonic()
+        wait = max(0.0, self.paused_until - now)
+        if self.rate > 0:
+            interval = 1 / self.rate
+            next_send = max(self.next_send, now)
+            wait = max(wait, next_send - (self.burst - 1) * interval - now)
+            if now + wait > deadline:
+                metrics.count_rejected("rate")
+                raise HTTPException(status_code=429, detail="Upstream rate limit reached",
+                                    headers={"Retry-After": str(math.ceil(wait))})
+            self.next_send = next_send + interval
+        elif now + wait > deadline:
+            metrics.count_rejected("paused")
+            raise HTTPException(status_code=429, detail="Upstream asked to retry later",
+                                headers={"Retry-After": str(math.ceil(wait))})
+        return wait
+    
+    @asynccontextmanager
+    async def slot(self):
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        wait = self._reserve(deadline)
+        self.waiting += 1
+        try:
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if self.semaphore is not None:
+                try:
+                    await asyncio.wait_for(self.semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    metrics.count_rejected("concurrency")
+                    raise HTTPException(status_code=503, detail="Too many concurrent upstream calls",
+                                        headers={"Retry-After": "1"})
+        finally:
+            self.waiting -= 1
+        metrics.upstream_queue_wait.observe(time.monotonic() - started)
+        try:
+            yield
+        finally:
+            if self.semaphore is not None:
+                self.semaphore.release()
+    
+    def stats(self):
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_concurrency": self.max_concurrency,
+            "waiting": self.waiting,
+            "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 3),
+        }
+
+# Spec defaults come from x-mcp-rate-limit; the environment overrides them
+upstream_limiter = UpstreamLimiter(
+    rate=float(os.environ.get("MCP_RATE_LIMIT", 0.0)),
+    burst=int(os.environ.get("MCP_RATE_BURST", 1)),
+    max_concurrency=int(os.environ.get("MCP_MAX_CONCURRENCY", 0)),
+    max_wait=float(os.environ.get("MCP_MAX_QUEUE_WAIT", "10")),
+)
+
+RETRY_ATTEMPTS = int(os.environ.get("MCP_RETRY_ATTEMPTS", "3"))
+RETRY_BACKOFF = float(os.environ.get("MCP_RETRY_BACKOFF", "0.5"))
+RETRY_MAX_DELAY = float(os.environ.get("MCP_RETRY_MAX_DELAY", "10"))
+RETRY_STATUSES = {429, 502, 503, 504}
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, (when - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+def backoff_delay(attempt):
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BACKOFF * (2 ** attempt)))
+
+async def fetch_upstream(operation_id, client, request):
+    """Send one upstream request through the limiter, retrying idempotent operations."""
+    attempts = 1 + RETRY_ATTEMPTS if OPERATIONS[operation_id]["idempotent"] else 1
+    for attempt in range(attempts):
+        response = error = None
+        async with upstream_limiter.slot():
+            started = time.perf_counter()
+            metrics.upstream_in_flight += 1
+            try:
+                response = await client.request(**request)
+            except httpx.HTTPError as e:
+                error = e
+            finally:
+                metrics.upstream_in_flight -= 1
+        last_attempt = attempt == attempts - 1
+        
+        if error is not None:
+            metrics.observe_upstream(operation_id, type(error).__name__, time.perf_counter() - started)
+            if last_attempt or not isinstance(error, httpx.TransportError):
+                raise HTTPException(status_code=502, detail=f"Upstream request failed: {error}")
+            delay = backoff_delay(attempt)
+        else:
+            metrics.observe_upstream(operation_id, response.status_code, time.perf_counter() - started)
+            retry_after = None
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                if retry_after:
+                    # Every caller waits out the upstream's requested pause, not just this one
+                    upstream_limiter.pause(retry_after)
+            if (last_attempt or response.status_code not in RETRY_STATUSES
+                    or (retry_after or 0) > upstream_limiter.max_wait):
+                return UpstreamResult(response.status_code, response.content, response.headers.get("content-type"))
+            delay = backoff_delay(attempt)
+        
+        metrics.count_retry(operation_id)
+        await asyncio.sleep(delay)
+
+# Headers that describe the raw bytes relayed by a streamed response
+STREAM_HEADERS = ("content-encoding", "content-length", "content-disposition", "etag", "last-modified")
+
+class UpstreamStreamingResponse(StreamingResponse):
+    """StreamingResponse that releases the upstream call however the response ends.
+    
+    Starlette never starts the body iterator if the client disconnects before
+    the response starts, so the cleanup cannot live in the iterator.
+    """
+    
+    def __init__(self, content, stack, **kwargs):
+        super().__init__(content, **kwargs)
+        self.stack = stack
+    
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.stack.aclose()
+
+async def stream_upstream(operation_id, client, request, accept_encoding=None):
+    """Relay the upstream body chunk by chunk, without decoding or buffering it.
+    
+    The limiter slot and the upstream connection are held until the response
+    has been sent or abandoned. The caller's Accept-Encoding is forwarded,
+    since the bytes are relayed as the upstream encoded them. Streamed calls
+    are neither cached nor retried.
+    """
+    # httpx would otherwise ask for gzip, which callers never requested
+    headers = dict(request["headers"] or {}, **{"accept-encoding": accept_encoding or "identity"})
+    request = dict(request, headers=headers)
+    stack = AsyncExitStack()
+    await stack.enter_async_context(upstream_limiter.slot())
+    started = time.perf_counter()
+    metrics.upstream_in_flight += 1
+    stack.callback(lambda: setattr(metrics, "upstream_in_flight", metrics.upstream_in_flight - 1))
+    try:
+        upstream = await client.send(client.build_request(**request), stream=True)
+    except httpx.HTTPError as e:
+        metrics.observe_upstream(operation_id, type(e).__name__, time.perf_counter() - started)
+        await stack.aclose()
+        raise HTTPException(status_code=502, detail=f"Upstream request failed: {e}")
+    except BaseException:
+        await stack.aclose()
+        raise
+    stack.push_async_callback(upstream.aclose)
+    metrics.observe_upstream(operation_id, upstream.status_code, time.perf_counter() - started)
+    
+    if upstream.status_code in (429, 503):
+        retry_after = parse_retry_after(upstream.headers.get("retry-after"))
+        if retry_after:
+            upstream_limiter.pause(retry_after)
+    
+    headers = {name: upstream.headers[name] for name in STREAM_HEADERS if name in upstream.headers}
+    return UpstreamStreamingResponse(upstream.aiter_raw(), stack, status_code=upstream.status_code,
+                                     media_type=upstream.headers.get("content-type"), headers=headers)
+
+def check_upstream_response(operation, result):
+    """Fully validate a successful upstream body against the operation's response model."""
+    model_name = operation["response_model"]
+    if model_name not in models_dict or not 200 <= result.status_code < 300:
+        return
+    try:
+        models_dict[model_name].model_validate_json(result.content)
+    except ValidationError as e:
+        metrics.count_validation_failures(model_name)
+        raise HTTPException(status_code=502, detail={
+            "message": f"Upstream response does not match {model_name}",
+            "errors": e.errors(include_url=False, include_input=False),
+        })
+
+async def call_operation(operation_id, arguments, client, stream=None, validate=False, accept_encoding=None):
+    """Forward a tool call to the upstream API and relay its response.
+    
+    stream overrides the operation's x-mcp-stream default. validate buffers
+    the body and checks it against the response model, so it disables streaming.
+    """
+    operation = OPERATIONS[operation_id]
+    arguments = arguments or {}
+    request = build_upstream_request(operation, arguments)
+    
+    if stream is None:
+        stream = operation["stream"]
+    if stream and not validate:
+        return await stream_upstream(operation_id, client, request, accept_encoding)
+    
+    if operation["cache_ttl"] > 0 and response_cache.enabled:
+        key = ResponseCache.make_key(operation_id, arguments)
+        result = await response_cache.get_or_fetch(key, operation["cache_ttl"], lambda: fetch_upstream(operation_id, client, request))
+    else:
+        result = await fetch_upstream(operation_id, client, request)
+    
+    if validate:
+        check_upstream_response(operation, result)
+    return Response(content=result.content, status_code=result.status_code, media_type=result.media_type)
+
+
+
+@app.post("/tools/post_pet", summary='Add a new pet')
+async def tool_post_pet(http_request: Request, arguments: Optional[Dict[str, Any]] = Body(default=None),
+                    stream: Optional[bool] = Query(None), validate: bool = Query(False),
+                    client: httpx.AsyncClient = Depends(get_api_client)):
+    return await call_operation('post_pet', arguments, client, stream, validate,
+                                http_request.headers.get("accept-encoding"))
+
+
+
 # --- Health Check ---
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "api_configured": bool(api_config.api_key and api_config.base_url)}
+    return {
+        "status": "healthy",
+        "api_configured": bool(api_config.api_key and api_config.base_url),
+        "cache": response_cache.stats(),
+        "limiter": upstream_limiter.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 # --- Main Entry Point ---
 if __name__ == "__main__":
+    import argparse
+    import shutil
+    import tempfile
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    
+    parser = argparse.ArgumentParser(description='Run the MCP server for Swagger Petstore')
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MCP_WORKERS", "1")), help="Worker processes (0: one per CPU)")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+    
+    if workers == 1:
+        uvicorn.run(app, host=args.host, port=args.port)
+    else:
+        # Workers import this module by name and share /config through a file
+        config_dir = None
+        if not os.environ.get("MCP_CONFIG_FILE"):
+            # A private directory, so no other user can plant the file first
+            config_dir = tempfile.mkdtemp(prefix="mcp_config_")
+            os.environ["MCP_CONFIG_FILE"] = os.path.join(config_dir, "config.json")
+        module_dir, module_file = os.path.split(os.path.abspath(__file__))
+        import_string = f"{os.path.splitext(module_file)[0]}:app"
+        try:
+            # loop/http "auto" pick uvloop and httptools when they are installed
+            uvicorn.run(import_string, host=args.host, port=args.port,
+                        workers=workers, app_dir=module_dir, loop="auto", http="auto")
+        finally:
+            if config_dir:
+                shutil.rmtree(config_dir, ignore_errors=True)
\ No newline at end of file
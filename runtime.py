@@ -0,0 +1,269 @@
+import argparse
+import datetime
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+import types
+from collections import OrderedDict
+from typing import Any, Dict, List, Literal, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from pydantic import ConfigDict, Field, RootModel, TypeAdapter, ValidationError, create_model
+
+import generator
+
+# Built apps kept in memory; the least recently used is dropped first
+APP_CACHE_SIZE = int(os.environ.get("MCP_RUNTIME_CACHE_SIZE", "64"))
+
+# Names the generator's type expressions refer to, besides the models themselves.
+# generator.RESERVED_CLASS_NAMES covers them, so schemas named e.g. Literal are renamed
+TYPE_NAMESPACE = {
+    'Any': Any, 'Dict': Dict, 'List': List, 'Literal': Literal, 'Optional': Optional, 'Union': Union,
+    'datetime': datetime,
+}
+
+# Suffixes keeping the models' module names unique
+_module_ids = itertools.count()
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.environ.get(name, default).lower() in ("1", "true", "yes", "on")
+
+# --- Models ---
+def build_models(models: Dict[str, Any], strict: bool = False, lazy: bool = False) -> Dict[str, type]:
+    """Create pydantic models from the generator's model definitions.
+
+    Fields, aliases, optionality and forward references follow the
+    generated code, so both validate the same way. The models are placed in
+    a new module registered in sys.modules, where pydantic resolves forward
+    references. With lazy, each model builds its validator on first use.
+    """
+    clashes = sorted(set(models) & set(TYPE_NAMESPACE))
+    if clashes:
+        raise ValueError(f"Model names shadow type names: {', '.join(clashes)}")
+    module = types.ModuleType(f"mcp_runtime_models_{next(_module_ids)}")
+    module.__dict__.update(TYPE_NAMESPACE)
+    sys.modules[module.__name__] = module
+    namespace = module.__dict__
+    built = {}
+    for name, model_def in models.items():
+        if model_def.get('root_type'):
+            root_type = eval(model_def['root_type'], namespace)
+            model = type(name, (RootModel[root_type],), {
+                'model_config': ConfigDict(strict=strict, defer_build=lazy),
+                '__module__': module.__name__,
+            })
+        else:
+            fields = {}
+            for prop_name, field_def in model_def['properties'].items():
+                py_type = eval(field_def['py_type'], namespace)
+                alias = field_def.get('alias')
+                if prop_name in model_def.get('required', []):
+                    fields[field_def['field_name']] = (py_type, Field(..., alias=alias) if alias else ...)
+                else:
+                    if not field_def['py_type'].startswith('Optional['):
+                        py_type = Optional[py_type]
+                    fields[field_def['field_name']] = (py_type, Field(None, alias=alias) if alias else None)
+            model = create_model(name, __config__=ConfigDict(populate_by_name=True, strict=strict, defer_build=lazy),
+                                 __module__=module.__name__, **fields)
+        namespace[name] = built[name] = model
+
+    if not lazy:
+        # Recursive models, and models using them, resolve their forward references now
+        for model in built.values():
+            if not model.__pydantic_complete__:
+                model.model_rebuild()
+    return built
+
+def context_document(context: Dict[str, Any]) -> Dict[str, Any]:
+    """The /context document, as the generated server's CONTEXT."""
+    models = {}
+    for name, model_def in context['models'].items():
+        fields = {}
+        for field, props in model_def['properties'].items():
+            entry = {"type": props['type'], "required": field in model_def.get('required', [])}
+            if props.get('enum'):
+                entry["enum"] = props['enum']
+            if props.get('model'):
+                entry["model"] = props['model']
+            entry["description"] = props.get('description', '')
+            fields[field] = entry
+        models[name] = {"fields": fields}
+        if model_def.get('root_type'):
+            models[name]["root"] = model_def['root_type']
+
+    operations = {}
+    for op in context['operations']:
+        parameters = {}
+        for param in op['params']:
+            entry = {"in": param['in'], "type": param['type'], "required": param['required']}
+            if 'default' in param:
+                entry["default"] = param['default']
+            if param.get('enum'):
+                entry["enum"] = param['enum']
+            entry["description"] = param.get('description')
+            parameters[param['name']] = entry
+        operations[op['operation_id']] = {
+            "method": op['method'],
+            "path": op['path'],
+            "summary": op['summary'],
+            "description": op['description'],
+            "parameters": parameters,
+            "body": {"required": op['body']['required'], "model": op['body']['model']} if op['body'] else None,
+            "response_model": op['response_model'],
+        }
+    return {"models": models, "operations": operations}
+
+# --- Server ---
+class RuntimeServer:
+    """A server for one spec, built in memory from the parsed spec without generating code.
+
+    Serves /context, /validate, /config and /health like a generated server.
+    Upstream tool calls, caching, rate limiting and metrics remain features
+    of generated servers.
+    """
+
+    def __init__(self, context: Dict[str, Any], options: Dict[str, Any] = None):
+        options = options or {}
+        self.context = context
+        self.models = build_models(context['models'], bool(options.get('strict')), bool(options.get('fast_startup')))
+        self.strict = _env_flag("MCP_STRICT_VALIDATION", 'true' if options.get('strict') else 'false')
+        self.adapters = {}
+        servers = context.get('servers') or []
+        self.api_key = os.environ.get("API_KEY", "")
+        self.base_url = os.environ.get("API_BASE_URL", servers[0]['url'] if servers else "http://localhost:8080")
+        self.context_body = json.dumps(context_document(context), separators=(",", ":"), default=str).encode("utf-8")
+        self.context_etag = f'"{hashlib.sha256(self.context_body).hexdigest()[:32]}"'
+
+        api_info = context['api_info']
+        self.app = FastAPI(
+            title=f"Model Context Protocol Server for {api_info['title']}",
+            description=f"MCP server built at runtime from OpenAPI spec for {api_info['title']}",
+            version=api_info['version'],
+        )
+        self.app.state.runtime = self
+        self._add_routes()
+
+    def release(self):
+        """Drop the models' module from sys.modules once the app is no longer served."""
+        if self.models:
+            sys.modules.pop(next(iter(self.models.values())).__module__, None)
+
+    def get_adapter(self, model_name: str) -> TypeAdapter:
+        adapter = self.adapters.get(model_name)
+        if adapter is None:
+            adapter = self.adapters[model_name] = TypeAdapter(self.models[model_name])
+        return adapter
+
+    def validate(self, model_name: str, data: Any, strict: bool) -> bytes:
+        adapter = self.get_adapter(model_name)
+        try:
+            if strict:
+                # As in generated servers, strict checks run on JSON input
+                validated = adapter.validate_json(json.dumps(data, default=str), strict=True)
+            else:
+                validated = adapter.validate_python(data, strict=False)
+        except ValidationError as e:
+            return b'{"valid":false,"errors":' + e.json().encode("utf-8") + b'}'
+        return b'{"valid":true,"data":' + adapter.dump_json(validated, by_alias=True) + b'}'
+
+    def _add_routes(self):
+        @self.app.get("/context")
+        async def list_models(request: Request):
+            headers = {"ETag": self.context_etag}
+            if_none_match = request.headers.get("if-none-match")
+            if if_none_match:
+                tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+                if self.context_etag in tags or "*" in tags:
+                    return Response(status_code=304, headers=headers)
+            return Response(content=self.context_body, media_type="application/json", headers=headers)
+
+        @self.app.post("/validate")
+        async def validate_model(request: Dict[str, Any]):
+            model_name = request.get("model_name")
+            strict = request.get("strict")
+            if strict is None:
+                strict = self.strict
+            elif not isinstance(strict, bool):
+                raise HTTPException(status_code=400, detail="strict must be a boolean")
+            if not model_name:
+                raise HTTPException(status_code=400, detail="model_name is required")
+            if model_name not in self.models:
+                raise HTTPException(status_code=404, detail=f"Model {model_name} not found")
+            body = self.validate(model_name, request.get("data", {}), strict)
+            return Response(content=body, media_type="application/json")
+
+        @self.app.post("/config")
+        async def update_config(config: Dict[str, str]):
+            if config.get("api_key"):
+                self.api_key = config["api_key"]
+            if config.get("base_url"):
+                self.base_url = config["base_url"]
+            return {"message": "Configuration updated successfully"}
+
+        @self.app.get("/health")
+        async def health_check():
+            return {
+                "status": "healthy",
+                "api_configured": bool(self.api_key and self.base_url),
+                "models": len(self.models),
+            }
+
+# --- App Cache ---
+_apps = OrderedDict()
+_apps_lock = threading.Lock()
+
+def spec_key(spec, options: Dict[str, Any] = None) -> str:
+    """Cache key for a spec (dict, bytes or text) and build options."""
+    digest = hashlib.sha256()
+    if isinstance(spec, str):
+        spec = spec.encode("utf-8")
+    if isinstance(spec, (bytes, bytearray)):
+        digest.update(spec)
+    else:
+        digest.update(json.dumps(spec, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(json.dumps(options or {}, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+def get_app(spec, options: Dict[str, Any] = None) -> FastAPI:
+    """Return the app for a spec, building it on first request and reusing it afterwards."""
+    key = spec_key(spec, options)
+    with _apps_lock:
+        app = _apps.get(key)
+        if app is not None:
+            _apps.move_to_end(key)
+            return app
+    # Built outside the lock; two threads racing on one spec both build, one app is kept
+    built = RuntimeServer(generator.parse_spec(spec), options).app
+    with _apps_lock:
+        app = _apps.setdefault(key, built)
+        _apps.move_to_end(key)
+        if app is not built:
+            built.state.runtime.release()
+        while len(_apps) > APP_CACHE_SIZE:
+            _, evicted = _apps.popitem(last=False)
+            evicted.state.runtime.release()
+    return app
+
+def load_app(spec_path: str, options: Dict[str, Any] = None) -> FastAPI:
+    with open(spec_path, 'rb') as f:
+        return get_app(f.read(), options)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve an OpenAPI spec directly, without generating a server module.")
+    parser.add_argument("spec_path", help="OpenAPI spec (YAML or JSON)")
+    parser.add_argument("--strict", action="store_true", help="Validate strictly by default")
+    parser.add_argument("--fast-startup", action="store_true", help="Build each model's validator on first use")
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT", "8000")))
+    args = parser.parse_args()
+
+    if not os.path.exists(args.spec_path):
+        print(f"Spec not found: {args.spec_path}")
+        sys.exit(1)
+    app = load_app(args.spec_path, {'strict': args.strict, 'fast_startup': args.fast_startup})
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port)
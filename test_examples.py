@@ -0,0 +1,22 @@
+"""The committed example servers must match what the generator renders from
+examples/, so a template change is committed together with its regenerated
+output (`python generator.py examples --force`).
+
+Run with `python -m pytest test_examples.py`.
+"""
+import os
+
+import pytest
+
+import generator
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples')
+
+@pytest.mark.parametrize("spec_path", generator.expand_spec_paths(EXAMPLES_DIR), ids=os.path.basename)
+def test_example_server_is_up_to_date(spec_path):
+    output_path = os.path.join(os.path.dirname(EXAMPLES_DIR), os.path.basename(generator.default_output_path(spec_path)))
+    with open(spec_path, 'rb') as f:
+        expected = generator.render_source(f.read())
+    with open(output_path, 'r') as f:
+        committed = f.read()
+    assert committed == expected, f"{output_path} is stale; run `python generator.py examples --force`"
@@ -10,6 +10,7 @@ load_dotenv()
 # Configuration
 CLAUDE_API_KEY = os.environ.get("CLAUDE_API_KEY", "")  # Get API key from .env file
 MCP_SERVER_URL = "http://localhost:8000"
+CONTEXT_CACHE_FILE = ".mcp_context_cache.json"
 
 # Initialize Claude client
 client = anthropic.Anthropic(api_key=CLAUDE_API_KEY)
@@ -25,9 +26,29 @@ def configure_mcp_server():
     return response.json()
 
 def get_mcp_context():
-    """Get the context (available models) from the MCP server."""
-    response = requests.get(f"{MCP_SERVER_URL}/context")
-    return response.json()
+    """Get the context (available models) from the MCP server.
+    
+    The last context is kept on disk and revalidated with its ETag, so
+    unchanged servers answer with an empty 304 instead of the full document.
+    """
+    cached = None
+    if os.path.exists(CONTEXT_CACHE_FILE):
+        with open(CONTEXT_CACHE_FILE, 'r') as f:
+            cached = json.load(f)
+        if cached.get("url") != MCP_SERVER_URL:
+            cached = None
+    
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+    response = requests.get(f"{MCP_SERVER_URL}/context", headers=headers)
+    if response.status_code == 304 and cached:
+        return cached["context"]
+    
+    context = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        with open(CONTEXT_CACHE_FILE, 'w') as f:
+            json.dump({"url": MCP_SERVER_URL, "etag": etag, "context": context}, f)
+    return context
 
 def validate_with_claude(model_name, context_data):
     """Use Claude to generate test data for a specific model and validate it."""
@@ -0,0 +1,134 @@
+"""Schema resolution tests: each spec is generated into a server module and
+built by the runtime, and both must accept and reject the same data.
+
+Run with `python -m pytest test_schema_resolver.py`.
+"""
+import pytest
+from pydantic import TypeAdapter, ValidationError
+
+import generator
+import runtime
+
+def make_spec(schemas):
+    return {"openapi": "3.0.0", "info": {"title": "Resolver Test", "version": "1"}, "paths": {},
+            "components": {"schemas": schemas}}
+
+def generated_models(spec):
+    return generator.build_server_module(spec).models_dict
+
+def runtime_models(spec):
+    return runtime.build_models(generator.parse_spec(spec)['models'])
+
+@pytest.fixture(params=[generated_models, runtime_models], ids=["generated", "runtime"])
+def build(request):
+    return request.param
+
+def valid(model, data):
+    try:
+        TypeAdapter(model).validate_python(data)
+    except ValidationError:
+        return False
+    return True
+
+def test_recursive_refs(build):
+    models = build(make_spec({
+        "Node": {"type": "object", "required": ["value"], "properties": {
+            "value": {"type": "integer"},
+            "parent": {"$ref": "#/components/schemas/Node"},
+            "children": {"type": "array", "items": {"$ref": "#/components/schemas/Node"}},
+        }},
+    }))
+    node = models["Node"]
+    tree = {"value": 1, "children": [{"value": 2, "children": [{"value": 3}]}], "parent": {"value": 0}}
+    assert valid(node, tree)
+    assert node.model_validate(tree).children[0].children[0].value == 3
+    assert not valid(node, {"value": 1, "children": [{"value": "deep"}]})
+    assert not valid(node, {"value": 1, "parent": {}})
+
+def test_all_of_with_ref(build):
+    models = build(make_spec({
+        "Base": {"type": "object", "required": ["id"], "properties": {"id": {"type": "integer"}}},
+        "Pet": {"allOf": [
+            {"$ref": "#/components/schemas/Base"},
+            {"type": "object", "required": ["name"], "properties": {"name": {"type": "string"}, "age": {"type": "integer"}}},
+        ]},
+    }))
+    pet = models["Pet"]
+    assert set(pet.model_fields) == {"id", "name", "age"}
+    assert valid(pet, {"id": 1, "name": "Rex"})
+    assert not valid(pet, {"name": "Rex"})
+    assert not valid(pet, {"id": 1})
+    assert not valid(pet, {"id": 1, "name": "Rex", "age": "old"})
+
+def test_one_of(build):
+    models = build(make_spec({
+        "Circle": {"type": "object", "required": ["radius"], "properties": {"radius": {"type": "number"}}},
+        "Square": {"type": "object", "required": ["side"], "properties": {"side": {"type": "number"}}},
+        "Drawing": {"type": "object", "required": ["shape"], "properties": {"shape": {"oneOf": [
+            {"$ref": "#/components/schemas/Circle"},
+            {"$ref": "#/components/schemas/Square"},
+        ]}}},
+    }))
+    drawing = models["Drawing"]
+    assert valid(drawing, {"shape": {"radius": 1.5}})
+    assert valid(drawing, {"shape": {"side": 2}})
+    assert not valid(drawing, {"shape": {"diameter": 3}})
+
+def test_nullable_enum(build):
+    models = build(make_spec({
+        "Order": {"type": "object", "required": ["status"], "properties": {
+            "status": {"type": "string", "enum": ["placed", "shipped"], "nullable": True},
+        }},
+    }))
+    order = models["Order"]
+    assert valid(order, {"status": "shipped"})
+    assert valid(order, {"status": None})
+    assert not valid(order, {"status": "lost"})
+    assert not valid(order, {})
+
+def test_renamed_fields(build):
+    models = build(make_spec({
+        "Pet": {"type": "object", "properties": {"name": {"type": "string"}}},
+        "Record": {"type": "object", "required": ["class"], "properties": {
+            "class": {"type": "string"},
+            "user-name": {"type": "string"},
+            "model_config": {"type": "string"},
+            "datetime": {"type": "string"},
+            "Pet": {"type": "string"},
+            "created": {"type": "string", "format": "date-time"},
+            "pet": {"$ref": "#/components/schemas/Pet"},
+        }},
+    }))
+    record = models["Record"]
+    data = {"class": "a", "user-name": "b", "model_config": "c", "datetime": "d", "Pet": "e",
+            "created": "2024-01-01T00:00:00Z", "pet": {"name": "Rex"}}
+    instance = record.model_validate(data)
+    dumped = instance.model_dump(mode="json", by_alias=True)
+    assert {key: dumped[key] for key in data if key not in ("created", "pet")} == \
+        {key: value for key, value in data.items() if key not in ("created", "pet")}
+    assert dumped["pet"] == {"name": "Rex"}
+    assert instance.created.year == 2024
+    assert not valid(record, {"user-name": "b"})
+    assert not valid(record, {"class": "a", "pet": {"name": 1}})
+
+def test_list_valued_types(build):
+    # Temporary schemas built for list-valued types must not share memoized types
+    properties = {}
+    for i in range(20):
+        properties[f"mixed{i}"] = {"type": ["array", "object"]}
+        properties[f"scalar{i}"] = {"type": ["boolean", "number"]}
+    models = build(make_spec({"Mixed": {"type": "object", "properties": properties}}))
+    mixed = models["Mixed"]
+    assert valid(mixed, {"mixed0": [1], "mixed19": {"a": 1}, "scalar0": True, "scalar19": 1.5})
+    assert not valid(mixed, {"mixed7": "text"})
+    assert not valid(mixed, {"scalar7": "text"})
+
+def test_list_valued_type_annotations():
+    properties = {}
+    for i in range(20):
+        properties[f"mixed{i}"] = {"type": ["array", "object"]}
+        properties[f"scalar{i}"] = {"type": ["boolean", "number"]}
+    model = generator.parse_spec(make_spec({"Mixed": {"type": "object", "properties": properties}}))['models']['Mixed']
+    for name, field_def in model['properties'].items():
+        expected = "Union[List[Any], Dict[str, Any]]" if name.startswith("mixed") else "Union[bool, float]"
+        assert field_def['py_type'] == expected, name